@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_alter_multistepstreamformpage_form_fields_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mysubmissionrevision',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_alter_mysubmissionrevision_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mysubmissionrevision',
+            name='delta_depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('home', '0007_mysubmissionrevision_delta_depth'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mysubmissionrevision',
+            name='submission_id',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='mysubmissionrevision',
+            index=models.Index(fields=['submission_ct', 'submission_id', 'created_at'], name='home_mysubm_submiss_405f61_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("home", "0008_mysubmissionrevision_submission_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mysessionformsubmission",
+            index=models.Index(
+                fields=["status", "last_modification"],
+                name="home_mysess_status_88548f_idx",
+            ),
+        ),
+    ]
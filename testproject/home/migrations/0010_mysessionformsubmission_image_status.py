@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_mysessionformsubmission_status_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mysessionformsubmission',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('verified', 'Verified'), ('rejected', 'Rejected')], default='', max_length=10, verbose_name='image status'),
+        ),
+    ]
@@ -0,0 +1,460 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:49
+
+import wagtail.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("home", "0010_mysessionformsubmission_image_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="multistepstreamformpage",
+            name="form_fields",
+            field=wagtail.fields.StreamField(
+                [("sf_step", 29)],
+                block_lookup={
+                    0: (
+                        "wagtail.blocks.CharBlock",
+                        (),
+                        {"label": "Name", "required": False},
+                    ),
+                    1: ("wagtail.blocks.CharBlock", (), {"label": "Label"}),
+                    2: (
+                        "wagtail.blocks.TextBlock",
+                        (),
+                        {"label": "Help text", "required": False},
+                    ),
+                    3: (
+                        "wagtail.blocks.BooleanBlock",
+                        (),
+                        {"label": "Required", "required": False},
+                    ),
+                    4: (
+                        "wagtail.blocks.ChoiceBlock",
+                        [],
+                        {
+                            "choices": [("email", "Email"), ("url", "URL")],
+                            "label": "Format",
+                            "required": False,
+                        },
+                    ),
+                    5: (
+                        "wagtail.blocks.CharBlock",
+                        (),
+                        {"label": "Default value", "required": False},
+                    ),
+                    6: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("format", 4),
+                                ("default_value", 5),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    7: (
+                        "wagtail.blocks.TextBlock",
+                        (),
+                        {"label": "Default value", "required": False},
+                    ),
+                    8: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("default_value", 7),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    9: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("default_value", 5),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    10: ("wagtail.blocks.CharBlock", (), {"label": "Checkbox"}),
+                    11: ("wagtail.blocks.ListBlock", (10,), {}),
+                    12: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("checkboxes", 11),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    13: ("wagtail.blocks.CharBlock", (), {"label": "Choice"}),
+                    14: ("wagtail.blocks.ListBlock", (13,), {}),
+                    15: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("choices", 14),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    16: (
+                        "wagtail.blocks.BooleanBlock",
+                        (),
+                        {"required": False},
+                    ),
+                    17: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("default_value", 16),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    18: ("wagtail.blocks.DateBlock", (), {"required": False}),
+                    19: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("default_value", 18),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    20: ("wagtail.blocks.TimeBlock", (), {"required": False}),
+                    21: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("default_value", 20),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    22: (
+                        "wagtail.blocks.DateTimeBlock",
+                        (),
+                        {"required": False},
+                    ),
+                    23: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                                ("default_value", 22),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    24: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    25: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 1),
+                                ("help_text", 2),
+                                ("required", 3),
+                            ]
+                        ],
+                        {
+                            "defer_verification": True,
+                            "group": "Fields",
+                            "max_dimension": 100,
+                        },
+                    ),
+                    26: (
+                        "wagtail.blocks.RichTextBlock",
+                        (),
+                        {"group": "Content"},
+                    ),
+                    27: (
+                        "wagtail.images.blocks.ImageBlock",
+                        [],
+                        {"group": "Content"},
+                    ),
+                    28: (
+                        "wagtail.blocks.StreamBlock",
+                        [
+                            [
+                                ("sf_singleline", 6),
+                                ("sf_multiline", 8),
+                                ("sf_number", 9),
+                                ("sf_checkboxes", 12),
+                                ("sf_radios", 15),
+                                ("sf_dropdown", 15),
+                                ("sf_checkbox", 17),
+                                ("sf_date", 19),
+                                ("sf_time", 21),
+                                ("sf_datetime", 23),
+                                ("sf_image", 24),
+                                ("sf_photo", 25),
+                                ("sf_file", 24),
+                                ("text", 26),
+                                ("image", 27),
+                            ]
+                        ],
+                        {},
+                    ),
+                    29: (
+                        "wagtail.blocks.StructBlock",
+                        [[("name", 0), ("form_fields", 28)]],
+                        {},
+                    ),
+                },
+            ),
+        ),
+        migrations.AlterField(
+            model_name="singlestepstreamformpage",
+            name="form_fields",
+            field=wagtail.fields.StreamField(
+                [
+                    ("sf_singleline", 5),
+                    ("sf_multiline", 7),
+                    ("sf_number", 8),
+                    ("sf_checkboxes", 11),
+                    ("sf_radios", 14),
+                    ("sf_dropdown", 14),
+                    ("sf_checkbox", 16),
+                    ("sf_date", 18),
+                    ("sf_time", 20),
+                    ("sf_datetime", 22),
+                    ("sf_image", 23),
+                    ("sf_photo", 24),
+                    ("sf_file", 23),
+                    ("text", 25),
+                    ("image", 26),
+                ],
+                block_lookup={
+                    0: ("wagtail.blocks.CharBlock", (), {"label": "Label"}),
+                    1: (
+                        "wagtail.blocks.TextBlock",
+                        (),
+                        {"label": "Help text", "required": False},
+                    ),
+                    2: (
+                        "wagtail.blocks.BooleanBlock",
+                        (),
+                        {"label": "Required", "required": False},
+                    ),
+                    3: (
+                        "wagtail.blocks.ChoiceBlock",
+                        [],
+                        {
+                            "choices": [("email", "Email"), ("url", "URL")],
+                            "label": "Format",
+                            "required": False,
+                        },
+                    ),
+                    4: (
+                        "wagtail.blocks.CharBlock",
+                        (),
+                        {"label": "Default value", "required": False},
+                    ),
+                    5: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("format", 3),
+                                ("default_value", 4),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    6: (
+                        "wagtail.blocks.TextBlock",
+                        (),
+                        {"label": "Default value", "required": False},
+                    ),
+                    7: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("default_value", 6),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    8: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("default_value", 4),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    9: ("wagtail.blocks.CharBlock", (), {"label": "Checkbox"}),
+                    10: ("wagtail.blocks.ListBlock", (9,), {}),
+                    11: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("checkboxes", 10),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    12: ("wagtail.blocks.CharBlock", (), {"label": "Choice"}),
+                    13: ("wagtail.blocks.ListBlock", (12,), {}),
+                    14: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("choices", 13),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    15: (
+                        "wagtail.blocks.BooleanBlock",
+                        (),
+                        {"required": False},
+                    ),
+                    16: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("default_value", 15),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    17: ("wagtail.blocks.DateBlock", (), {"required": False}),
+                    18: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("default_value", 17),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    19: ("wagtail.blocks.TimeBlock", (), {"required": False}),
+                    20: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("default_value", 19),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    21: (
+                        "wagtail.blocks.DateTimeBlock",
+                        (),
+                        {"required": False},
+                    ),
+                    22: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                                ("default_value", 21),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    23: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                            ]
+                        ],
+                        {"group": "Fields"},
+                    ),
+                    24: (
+                        "wagtail.blocks.StructBlock",
+                        [
+                            [
+                                ("field_label", 0),
+                                ("help_text", 1),
+                                ("required", 2),
+                            ]
+                        ],
+                        {
+                            "defer_verification": True,
+                            "group": "Fields",
+                            "max_dimension": 100,
+                        },
+                    ),
+                    25: (
+                        "wagtail.blocks.RichTextBlock",
+                        (),
+                        {"group": "Content"},
+                    ),
+                    26: (
+                        "wagtail.images.blocks.ImageBlock",
+                        [],
+                        {"group": "Content"},
+                    ),
+                },
+            ),
+        ),
+    ]
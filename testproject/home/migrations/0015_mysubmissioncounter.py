@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("home", "0014_myanswerstatistic"),
+        ("wagtailcore", "0097_baselogentry_uuid_action_timestamp_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MySubmissionCounter",
+            fields=[
+                (
+                    "page",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="wagtailcore.page",
+                    ),
+                ),
+                ("draft_count", models.PositiveIntegerField(default=0)),
+                ("submission_count", models.PositiveIntegerField(default=0)),
+                (
+                    "last_submit_time",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -12,8 +12,13 @@ from wagtail.images.blocks import ImageBlock
 from wagtail.models import Page
 
 from wagtail_flexible_forms import blocks as wff_blocks
+from wagtail_flexible_forms.models import AbstractAnswerStatistic
 from wagtail_flexible_forms.models import AbstractSessionFormSubmission
+from wagtail_flexible_forms.models import AbstractSubmissionCounter
 from wagtail_flexible_forms.models import AbstractSubmissionRevision
+from wagtail_flexible_forms.models import AbstractSubmissionRevisionOutbox
+from wagtail_flexible_forms.models import AbstractSubmissionValue
+from wagtail_flexible_forms.models import AbstractUploadBlob
 from wagtail_flexible_forms.models import StreamFormMixin
 
 
@@ -73,6 +78,13 @@ STREAMFORM_FIELDS = [
     ("sf_time", wff_blocks.TimeFieldBlock(group="Fields")),
     ("sf_datetime", wff_blocks.DateTimeFieldBlock(group="Fields")),
     ("sf_image", wff_blocks.ImageFieldBlock(group="Fields")),
+    # Images verified and downscaled in the background.
+    (
+        "sf_photo",
+        wff_blocks.ImageFieldBlock(
+            group="Fields", defer_verification=True, max_dimension=100
+        ),
+    ),
     ("sf_file", wff_blocks.FileFieldBlock(group="Fields")),
     # And content blocks from Wagtail!
     ("text", blocks.RichTextBlock(group="Content")),
@@ -86,11 +98,46 @@ class MySubmissionRevision(AbstractSubmissionRevision):
     pass
 
 
+# Optionally, revisions can be created in batches by the
+# ``drain_revision_outbox`` command, rather than during requests. Set
+# ``revision_writer_class`` to ``QueuedSubmissionRevisionWriter`` to use it.
+class MySubmissionRevisionOutbox(AbstractSubmissionRevisionOutbox):
+    pass
+
+
 class MySessionFormSubmission(AbstractSessionFormSubmission):
     @staticmethod
     def get_revision_class():
         return MySubmissionRevision
 
+    @staticmethod
+    def get_revision_outbox_class():
+        return MySubmissionRevisionOutbox
+
+
+# Optionally, uploaded files can be stored once per content, however many times
+# they are uploaded. Return this from ``get_upload_blob_class()`` on the page.
+class MyUploadBlob(AbstractUploadBlob):
+    pass
+
+
+# Optionally, the answers of final submissions can be indexed to filter
+# submissions by answer. Return this from ``get_submission_value_class()``.
+class MySubmissionValue(AbstractSubmissionValue):
+    pass
+
+
+# Optionally, the answers to choice fields can be counted as submissions are
+# made. Return this from ``get_answer_statistic_class()``.
+class MyAnswerStatistic(AbstractAnswerStatistic):
+    pass
+
+
+# Optionally, the drafts and submissions of a page can be counted as they are
+# made. Return this from ``get_submission_counter_class()``.
+class MySubmissionCounter(AbstractSubmissionCounter):
+    pass
+
 
 # Finally, we'll define our Page which pulls it all together.
 class SingleStepStreamFormPage(StreamFormMixin, Page):
@@ -162,3 +209,7 @@ class MultiStepStreamFormPage(StreamFormMixin, Page):
     @staticmethod
     def get_session_submission_class():
         return MySessionFormSubmission
+
+    @staticmethod
+    def get_submission_counter_class():
+        return MySubmissionCounter
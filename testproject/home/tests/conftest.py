@@ -0,0 +1,116 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from wagtail.models import Site
+
+from home.models import MultiStepStreamFormPage
+from wagtail_flexible_forms.cache import form_cache
+
+
+def make_steps(step_count):
+    """
+    Returns the raw ``form_fields`` of a form with one required text field
+    per step.
+    """
+    return [
+        {
+            "type": "sf_step",
+            "value": {
+                "name": "Step %s" % (index + 1),
+                "form_fields": [
+                    {
+                        "type": "sf_singleline",
+                        "value": {
+                            "field_label": "Field %s" % (index + 1),
+                            "help_text": "",
+                            "required": True,
+                            "format": "",
+                            "default_value": "",
+                        },
+                    }
+                ],
+            },
+        }
+        for index in range(step_count)
+    ]
+
+
+def make_field_step(block_type, label, required=False, **value):
+    """
+    Returns the raw ``form_fields`` of a form with a single step holding a
+    single field.
+    """
+    return [
+        {
+            "type": "sf_step",
+            "value": {
+                "name": "",
+                "form_fields": [
+                    {
+                        "type": block_type,
+                        "value": dict(
+                            field_label=label,
+                            help_text="",
+                            required=required,
+                            **value,
+                        ),
+                    }
+                ],
+            },
+        }
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_form_cache():
+    form_cache.clear()
+    yield
+    form_cache.clear()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def static_files(settings):
+    # The manifest of the default storage is not built in tests.
+    settings.STORAGES = dict(
+        settings.STORAGES,
+        staticfiles={
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    )
+
+
+@pytest.fixture
+def home_page(db):
+    return Site.objects.get(is_default_site=True).root_page
+
+
+@pytest.fixture
+def make_form_page(home_page):
+    def make_form_page(form_fields, page_class=MultiStepStreamFormPage):
+        page = page_class(
+            title="Form %s" % (home_page.get_children_count() + 1),
+            form_fields=form_fields,
+        )
+        home_page.add_child(instance=page)
+        return page_class.objects.get(pk=page.pk)
+
+    return make_form_page
+
+
+@pytest.fixture
+def make_request(rf):
+    def make_request(page, method="get", data=None, session=None):
+        request = getattr(rf, method)(page.url, data or {})
+        request.user = AnonymousUser()
+        SessionMiddleware(lambda request: None).process_request(request)
+        if session is not None:
+            request.session = session
+        return request
+
+    return make_request
@@ -0,0 +1,102 @@
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MultiStepStreamFormPage
+from home.models import MyAnswerStatistic
+from home.models import MySubmissionValue
+
+from .conftest import make_field_step
+
+
+@pytest.fixture
+def choices_page(make_form_page, monkeypatch):
+    monkeypatch.setattr(
+        MultiStepStreamFormPage,
+        "get_submission_value_class",
+        staticmethod(lambda: MySubmissionValue),
+    )
+    return make_form_page(
+        make_field_step(
+            "sf_checkboxes", "Choices", checkboxes=["a", "b", "a, b"]
+        )
+    )
+
+
+@pytest.fixture
+def statistics(monkeypatch):
+    monkeypatch.setattr(
+        MultiStepStreamFormPage,
+        "get_answer_statistic_class",
+        staticmethod(lambda: MyAnswerStatistic),
+    )
+
+
+def get_values():
+    return sorted(
+        MySubmissionValue.objects.values_list("submission_id", "value")
+    )
+
+
+def test_values_are_indexed_from_cleaned_data(choices_page):
+    client = Client()
+    client.post(choices_page.url, {"choices": ["a, b"]})
+    client.post(choices_page.url, {"choices": ["a", "b"]})
+    first, second = FormSubmission.objects.order_by("pk")
+    # Both submissions display "a, b".
+    assert first.form_data["choices"] == second.form_data["choices"]
+    assert get_values() == [
+        (first.pk, "a, b"),
+        (second.pk, "a"),
+        (second.pk, "b"),
+    ]
+    assert list(
+        choices_page.filter_submissions_by_value(
+            FormSubmission.objects.all(), "choices", "a"
+        )
+    ) == [second]
+
+
+def test_values_are_rebuilt(choices_page):
+    Client().post(choices_page.url, {"choices": ["a", "b"]})
+    submission = FormSubmission.objects.get()
+    MySubmissionValue.objects.all().delete()
+    call_command("rebuild_submission_values", verbosity=0)
+    assert get_values() == [(submission.pk, "a"), (submission.pk, "b")]
+
+
+def get_statistics():
+    return sorted(MyAnswerStatistic.objects.values_list("value", "count"))
+
+
+def test_answers_are_counted_from_cleaned_data(choices_page, statistics):
+    client = Client()
+    client.post(choices_page.url, {"choices": ["a, b"]})
+    client.post(choices_page.url, {"choices": ["a", "b"]})
+    assert get_statistics() == [("a", 1), ("a, b", 1), ("b", 1)]
+
+
+def test_answers_are_recounted_from_values(choices_page, statistics):
+    client = Client()
+    client.post(choices_page.url, {"choices": ["a, b"]})
+    client.post(choices_page.url, {"choices": ["a"]})
+    MyAnswerStatistic.objects.all().delete()
+    call_command("rebuild_answer_statistics", verbosity=0)
+    assert get_statistics() == [("a", 1), ("a, b", 1)]
+
+
+def test_answers_are_recounted_from_displayed_data(
+    choices_page, statistics, monkeypatch
+):
+    monkeypatch.setattr(
+        MultiStepStreamFormPage,
+        "get_submission_value_class",
+        staticmethod(lambda: None),
+    )
+    client = Client()
+    client.post(choices_page.url, {"choices": ["a", "b"]})
+    client.post(choices_page.url, {"choices": ["b"]})
+    MyAnswerStatistic.objects.all().delete()
+    call_command("rebuild_answer_statistics", verbosity=0)
+    assert get_statistics() == [("a", 1), ("b", 2)]
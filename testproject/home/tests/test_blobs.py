@@ -0,0 +1,77 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_delete
+from django.test import Client
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MultiStepStreamFormPage
+from home.models import MyUploadBlob
+from wagtail_flexible_forms import models as wff_models
+from wagtail_flexible_forms.models import release_submission_blobs
+
+from .conftest import make_field_step
+
+
+def test_uploads_are_stored_once_and_hashed_once(
+    make_form_page, media_root, monkeypatch, django_capture_on_commit_callbacks
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    monkeypatch.setattr(page, "get_upload_blob_class", lambda: MyUploadBlob)
+    hashes = []
+    get_content_hash = wff_models.get_content_hash
+
+    def count_hashes(file):
+        hashes.append(file.name)
+        return get_content_hash(file)
+
+    monkeypatch.setattr(wff_models, "get_content_hash", count_hashes)
+    path1 = page.store_upload(SimpleUploadedFile("a.txt", b"abc"))
+    path2 = page.store_upload(SimpleUploadedFile("b.txt", b"abc"))
+    assert hashes == ["a.txt", "b.txt"]
+    assert path1 == path2
+    assert MyUploadBlob.objects.get(path=path1).references == 2
+
+    page.release_upload(path1)
+    assert page.get_storage().exists(path1)
+    with django_capture_on_commit_callbacks(execute=True):
+        page.release_upload(path2)
+    assert not MyUploadBlob.objects.exists()
+    assert not page.get_storage().exists(path1)
+
+
+def test_blob_acquired_again_before_commit_is_kept(
+    make_form_page, media_root, monkeypatch, django_capture_on_commit_callbacks
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    monkeypatch.setattr(page, "get_upload_blob_class", lambda: MyUploadBlob)
+    path = page.store_upload(SimpleUploadedFile("a.txt", b"abc"))
+    with django_capture_on_commit_callbacks(execute=True):
+        page.release_upload(path)
+        assert page.store_upload(SimpleUploadedFile("b.txt", b"abc")) == path
+    assert MyUploadBlob.objects.get(path=path).references == 1
+    assert page.get_storage().exists(path)
+
+
+def test_deleted_final_submission_releases_blobs(
+    make_form_page, media_root, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(
+        MultiStepStreamFormPage,
+        "get_upload_blob_class",
+        staticmethod(lambda: MyUploadBlob),
+    )
+    # Connected by the app config for pages with upload blobs.
+    post_delete.connect(release_submission_blobs, sender=FormSubmission)
+    try:
+        page = make_form_page(make_field_step("sf_file", "Upload"))
+        Client().post(
+            page.url, {"upload": SimpleUploadedFile("a b.txt", b"abc")}
+        )
+        submission = FormSubmission.objects.get()
+        path = MyUploadBlob.objects.get().path
+        assert submission.form_data["upload"] == page.get_storage().url(path)
+        with django_capture_on_commit_callbacks(execute=True):
+            submission.delete()
+    finally:
+        post_delete.disconnect(release_submission_blobs, sender=FormSubmission)
+    assert not MyUploadBlob.objects.exists()
+    assert not page.get_storage().exists(path)
@@ -0,0 +1,153 @@
+import datetime
+
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MultiStepStreamFormPage
+from home.models import MySessionFormSubmission
+from home.models import MySubmissionCounter
+from home.models import SingleStepStreamFormPage
+from wagtail_flexible_forms.models import count_created_draft
+from wagtail_flexible_forms.models import count_deleted_submission
+from wagtail_flexible_forms.models import get_form_page_with
+
+from .conftest import make_steps
+
+
+def test_session_submission_is_looked_up_with_one_query(
+    make_form_page, make_request, django_assert_num_queries
+):
+    page = make_form_page(make_steps(1))
+    request = make_request(page)
+    request.session.create()
+    MySessionFormSubmission.objects.create(
+        page=page, session_key=request.session.session_key, form_data="[{}]"
+    )
+    with django_assert_num_queries(1):
+        submission = page.get_session_submission(request)
+    assert submission.pk is not None
+
+
+def test_pages_without_counter_are_not_fetched(
+    make_form_page, django_assert_num_queries
+):
+    # Shares its submission classes with pages which have a counter.
+    page = make_form_page(
+        make_steps(1)[0]["value"]["form_fields"],
+        page_class=SingleStepStreamFormPage,
+    )
+    submission = MySessionFormSubmission(page_id=page.pk)
+    with django_assert_num_queries(1):
+        # Only the content type of the page.
+        count_created_draft(
+            MySessionFormSubmission, instance=submission, created=True
+        )
+    submission.page = page
+    with django_assert_num_queries(0):
+        count_deleted_submission(MySessionFormSubmission, instance=submission)
+
+
+def test_cached_page_is_reused(make_form_page, django_assert_num_queries):
+    page = make_form_page(make_steps(1))
+    submission = MySessionFormSubmission(page=page)
+    with django_assert_num_queries(0):
+        assert (
+            get_form_page_with(submission, "get_submission_counter_class")
+            is page
+        )
+
+
+def get_counts(page):
+    return MySubmissionCounter.objects.values_list(
+        "draft_count", "submission_count"
+    ).get(page=page)
+
+
+def test_submissions_are_counted(make_form_page):
+    page = make_form_page(make_steps(2))
+    client = Client()
+    client.post(page.url, {"field-1": "a"})
+    # Created along with the first draft.
+    assert get_counts(page) == (1, 0)
+    client.post(page.url, {"field-2": "b"})
+    # The completed draft is deleted.
+    assert get_counts(page) == (0, 1)
+    submission = FormSubmission.objects.get()
+    counter = MySubmissionCounter.objects.get(page=page)
+    assert counter.last_submit_time == submission.submit_time
+
+    client.post(page.url, {"field-1": "c"})
+    assert get_counts(page) == (1, 1)
+    submission.delete()
+    MySessionFormSubmission.objects.get().delete()
+    assert get_counts(page) == (0, 0)
+    counter.refresh_from_db()
+    assert counter.last_submit_time is None
+
+
+def test_missing_counter_is_counted_once(make_form_page):
+    page = make_form_page(make_steps(1))
+    FormSubmission.objects.create(page=page, form_data={})
+    MySubmissionCounter.objects.all().delete()
+    page.update_submission_counter(submissions=1)
+    # The new submission is already counted when the counter is created.
+    assert get_counts(page) == (0, 1)
+
+
+def test_counters_are_rebuilt(make_form_page):
+    page = make_form_page(make_steps(1))
+    FormSubmission.objects.create(page=page, form_data={})
+    MySessionFormSubmission.objects.create(
+        page=page, session_key="a", form_data="[{}]"
+    )
+    MySubmissionCounter.objects.filter(page=page).update(
+        draft_count=5, submission_count=5
+    )
+    call_command("rebuild_submission_counters", verbosity=0)
+    assert get_counts(page) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_stale_drafts_use_status_index():
+    before = timezone.now() - datetime.timedelta(days=30)
+    plan = MySessionFormSubmission.objects.stale(before).explain()
+    assert "home_mysess_status_88548f_idx" in plan
+
+
+@pytest.fixture
+def deferred_page(make_form_page, monkeypatch):
+    monkeypatch.setattr(MultiStepStreamFormPage, "defer_session", True)
+    return make_form_page(make_steps(2))
+
+
+def test_deferred_session_is_not_created_on_get(deferred_page):
+    client = Client()
+    response = client.get(deferred_page.url)
+    assert response.status_code == 200
+    assert settings.SESSION_COOKIE_NAME not in response.cookies
+    assert not Session.objects.exists()
+    # Invalid steps are not stored either.
+    response = client.post(deferred_page.url, {"field-1": ""})
+    assert settings.SESSION_COOKIE_NAME not in response.cookies
+    assert not MySessionFormSubmission.objects.exists()
+
+
+def test_deferred_session_is_created_on_first_valid_step(deferred_page):
+    client = Client()
+    response = client.post(deferred_page.url, {"field-1": "a"})
+    session_key = response.cookies[settings.SESSION_COOKIE_NAME].value
+    submission = MySessionFormSubmission.objects.get()
+    assert submission.session_key == session_key
+    client.post(deferred_page.url, {"field-2": "b"})
+    assert FormSubmission.objects.get().form_data["field-1"] == "a"
+
+
+def test_session_is_created_on_get_by_default(make_form_page):
+    page = make_form_page(make_steps(2))
+    response = Client().get(page.url)
+    assert settings.SESSION_COOKIE_NAME in response.cookies
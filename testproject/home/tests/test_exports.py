@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MySessionFormSubmission
+from wagtail_flexible_forms.exports import SubmissionExporter
+
+from .conftest import make_steps
+
+
+def test_export_does_not_fetch_page_per_row(
+    make_form_page, django_assert_num_queries
+):
+    page = make_form_page(make_steps(1))
+    for index in range(3):
+        FormSubmission.objects.create(page=page, form_data={"field-1": "a"})
+        MySessionFormSubmission.objects.create(
+            page=page, session_key=str(index), form_data='[{"field-1": "a"}]'
+        )
+    for Submission in (FormSubmission, MySessionFormSubmission):
+        # Fetched without the page, as if from another query.
+        queryset = Submission.objects.filter(page_id=page.pk)
+        with django_assert_num_queries(1):
+            rows = list(SubmissionExporter(page, queryset).iter_rows())
+        assert [row[-1] for row in rows] == ["a", "a", "a"]
+
+
+def test_listing_does_not_fetch_page_per_row(make_form_page, rf, admin_user):
+    page = make_form_page(make_steps(1))
+
+    def count_queries():
+        request = rf.get("/")
+        request.user = admin_user
+        with CaptureQueriesContext(connection) as queries:
+            response = page.serve_submissions_list_view(
+                request, page_id=page.pk
+            )
+            response.render()
+        assert response.status_code == 200
+        return len(queries)
+
+    FormSubmission.objects.create(page=page, form_data={"field-1": "a"})
+    count_queries()  # Caches content types and permissions.
+    expected = count_queries()
+    for index in range(4):
+        FormSubmission.objects.create(page=page, form_data={"field-1": "a"})
+    assert count_queries() == expected
+
+
+@pytest.fixture
+def submissions_page(make_form_page):
+    page = make_form_page(make_steps(1))
+    for value in ("a", "b"):
+        FormSubmission.objects.create(page=page, form_data={"field-1": value})
+    return page
+
+
+def test_csv_is_streamed(submissions_page):
+    exporter = SubmissionExporter(
+        submissions_page,
+        FormSubmission.objects.filter(page=submissions_page).order_by("pk"),
+        chunk_size=1,
+    )
+    response = exporter.as_response(SubmissionExporter.CSV, "export")
+    assert isinstance(response, StreamingHttpResponse)
+    assert response["Content-Disposition"] == (
+        'attachment; filename="export.csv"'
+    )
+    rows = list(csv.reader(b"".join(response).decode().splitlines()))
+    assert rows[0][-1] == "Field 1"
+    assert [row[-1] for row in rows[1:]] == ["a", "b"]
+
+
+def test_ndjson_has_one_object_per_submission(submissions_page):
+    exporter = SubmissionExporter(
+        submissions_page,
+        FormSubmission.objects.filter(page=submissions_page).order_by("pk"),
+    )
+    output = io.BytesIO()
+    exporter.write(SubmissionExporter.NDJSON, output)
+    lines = output.getvalue().decode().splitlines()
+    assert [json.loads(line)["field-1"] for line in lines] == ["a", "b"]
+
+
+def test_admin_export_is_streamed(submissions_page, rf, admin_user):
+    request = rf.get("/", {"export": "csv"})
+    request.user = admin_user
+    response = submissions_page.serve_submissions_list_view(
+        request, page_id=submissions_page.pk
+    )
+    assert isinstance(response, StreamingHttpResponse)
+    assert b"".join(response).decode().count("\n") == 3
+
+
+def test_command_exports_drafts_to_xlsx(make_form_page, tmp_path):
+    page = make_form_page(make_steps(1))
+    MySessionFormSubmission.objects.create(
+        page=page, session_key="a", form_data='[{"field-1": "a"}]'
+    )
+    output = tmp_path / "export.xlsx"
+    call_command(
+        "export_form_submissions",
+        page.pk,
+        format="xlsx",
+        output=str(output),
+        drafts=True,
+    )
+    rows = list(load_workbook(output).active.values)
+    assert rows[0][-1] == "Field 1"
+    assert rows[1][-1] == "a"
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from home.models import MultiStepStreamFormPage
+from home.models import MySessionFormSubmission
+
+
+def make_field(block_type, label, **value):
+    return {
+        "type": block_type,
+        "value": dict(field_label=label, help_text="", required=False, **value),
+    }
+
+
+@pytest.fixture
+def page(make_form_page):
+    return make_form_page(
+        [
+            {
+                "type": "sf_step",
+                "value": {
+                    "name": "",
+                    "form_fields": [
+                        make_field(
+                            "sf_singleline",
+                            "Email",
+                            format="email",
+                            default_value="",
+                        ),
+                        make_field(
+                            "sf_checkboxes", "Choices", checkboxes=["a"]
+                        ),
+                        make_field("sf_checkbox", "Agree", default_value=False),
+                        make_field("sf_number", "Number"),
+                        make_field("sf_file", "Upload"),
+                    ],
+                },
+            }
+        ]
+    )
+
+
+def make_submission(page, index, data):
+    return MySessionFormSubmission(
+        page=page, session_key=str(index), form_data=json.dumps([data])
+    )
+
+
+DATA = {
+    "email": "a@example.com",
+    "choices": ["a", "b"],
+    "agree": True,
+    "number": "",
+    "upload": "stream_forms/ab/cd/abcd/a.txt",
+}
+
+
+def test_formatters_match_format_value(page):
+    submission = make_submission(page, 0, DATA)
+    fields = page.get_form_schema().fields
+    expected = {
+        name: submission.format_value(fields[name].field, value)
+        for name, value in DATA.items()
+    }
+    assert submission.get_data(add_metadata=False) == expected
+    assert expected["agree"] == "Yes"
+    assert expected["choices"] == "a, b"
+    assert expected["number"] == "-"
+    assert expected["upload"].endswith("a.txt")
+
+
+def test_formatters_are_resolved_once(page, monkeypatch):
+    resolved = []
+    get_value_formatter = MySessionFormSubmission.get_value_formatter
+
+    def count_resolved(cls, field):
+        resolved.append(field)
+        return get_value_formatter(field)
+
+    monkeypatch.setattr(
+        MySessionFormSubmission,
+        "get_value_formatter",
+        classmethod(count_resolved),
+    )
+    for index in range(3):
+        make_submission(page, index, DATA).get_data()
+    assert len(resolved) == len(DATA)
+
+
+def test_custom_format_value_is_used(page, monkeypatch):
+    monkeypatch.setattr(
+        MultiStepStreamFormPage,
+        "format_value",
+        lambda self, field, value: "custom",
+    )
+    data = make_submission(page, 0, DATA).get_data(add_metadata=False)
+    assert set(data.values()) == {"custom", "-"}
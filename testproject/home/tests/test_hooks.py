@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from wagtail.contrib.forms.utils import get_forms_for_user
+
+from home.models import FormPage
+
+from .conftest import make_steps
+
+
+def test_forms_for_user_are_fetched_in_one_query(
+    make_form_page, home_page, admin_user, django_assert_num_queries
+):
+    stream_page = make_form_page(make_steps(1))
+    form_page = home_page.add_child(instance=FormPage(title="Form"))
+    list(get_forms_for_user(admin_user))  # Caches content types.
+    with django_assert_num_queries(1):
+        pages = set(get_forms_for_user(admin_user))
+    assert {page.pk for page in pages} == {stream_page.pk, form_page.pk}
+
+
+def test_forms_are_filtered_by_permission(make_form_page):
+    make_form_page(make_steps(1))
+    user = get_user_model().objects.create_user("editor", password="x")
+    assert not get_forms_for_user(user).exists()
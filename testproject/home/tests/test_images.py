@@ -0,0 +1,148 @@
+import hashlib
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from PIL import Image
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MySessionFormSubmission
+from home.models import MyUploadBlob
+from wagtail_flexible_forms import models as wff_models
+
+from .conftest import make_field_step
+
+
+def make_photo(size=200):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera"
+    output = io.BytesIO()
+    Image.new("RGB", (size, size), "red").save(
+        output, "JPEG", exif=exif.tobytes()
+    )
+    return output.getvalue()
+
+
+class InlineExecutor:
+    def submit(self, function):
+        function()
+
+
+def test_last_step_images_are_processed_in_background(
+    make_form_page,
+    media_root,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    page = make_form_page(make_field_step("sf_photo", "Photo"))
+    processed = []
+    process_image = wff_models.process_image
+
+    def count_processed(storage, path, max_dimension=None):
+        processed.append(path)
+        return process_image(storage, path, max_dimension)
+
+    monkeypatch.setattr(wff_models, "process_image", count_processed)
+    monkeypatch.setattr(wff_models, "get_image_executor", InlineExecutor)
+    # Runs in the test transaction rather than in a thread.
+    monkeypatch.setattr(wff_models, "close_old_connections", lambda: None)
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = Client().post(
+            page.url,
+            {"photo": SimpleUploadedFile("photo.jpg", make_photo())},
+        )
+    assert response.status_code == 200
+    assert not processed
+    assert not FormSubmission.objects.filter(page=page).exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for callback in callbacks:
+            callback()
+
+    assert len(processed) == 1
+    (original,) = processed
+    storage = page.get_storage()
+    assert not storage.exists(original)
+    assert not MySessionFormSubmission.objects.filter(page=page).exists()
+    url = FormSubmission.objects.get(page=page).form_data["photo"]
+    (path,) = [
+        file.relative_to(media_root).as_posix()
+        for file in media_root.rglob("*.jpg")
+    ]
+    assert url.endswith(path)
+    with Image.open(storage.path(path)) as image:
+        assert image.size == (100, 100)
+        assert not image.info.get("exif")
+
+
+def test_processing_does_not_modify_shared_blobs(
+    make_form_page,
+    media_root,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    page = make_form_page(make_field_step("sf_photo", "Photo"))
+    monkeypatch.setattr(page, "get_upload_blob_class", lambda: MyUploadBlob)
+    storage = page.get_storage()
+    photo = make_photo()
+    submissions = []
+    for session_key in ("a" * 32, "b" * 32):
+        path = page.store_upload(SimpleUploadedFile("photo.jpg", photo))
+        submission = MySessionFormSubmission.objects.create(
+            page=page,
+            session_key=session_key,
+            form_data=json.dumps([{"photo": path}]),
+        )
+        submission.page = page
+        submissions.append(submission)
+    original = MyUploadBlob.objects.get(path=path)
+    assert original.references == 2
+
+    # The second run finds the image already replaced.
+    for _run in range(2):
+        with django_capture_on_commit_callbacks(execute=True):
+            submissions[0].process_images([(path, 100)])
+
+    new_path = json.loads(submissions[0].form_data)[0]["photo"]
+    assert new_path != path
+    assert submissions[0].image_status == submissions[0].IMAGES_VERIFIED
+    original.refresh_from_db()
+    assert original.references == 1
+    with storage.open(path) as file:
+        assert hashlib.sha256(file.read()).hexdigest() == original.content_hash
+    assert MyUploadBlob.objects.get(path=new_path).references == 1
+
+
+def test_step_keeps_images_replaced_in_background(
+    make_form_page, make_request, media_root
+):
+    form_fields = make_field_step("sf_photo", "Photo")
+    form_fields[0]["value"]["form_fields"].append(
+        make_field_step("sf_singleline", "Name")[0]["value"]["form_fields"][0]
+    )
+    page = make_form_page(form_fields)
+    storage = page.get_storage()
+    original = page.store_upload(SimpleUploadedFile("a.jpg", make_photo()))
+    replaced = page.store_upload(SimpleUploadedFile("b.jpg", make_photo()))
+    request = make_request(page, "post", {"name": "Name"})
+    request.session.create()
+    MySessionFormSubmission.objects.create(
+        page=page,
+        session_key=request.session.session_key,
+        form_data=json.dumps([{"photo": original}]),
+    )
+    form = page.get_context(request)["form"]
+    assert form.is_valid()
+    # Replaced by ``process_images()`` while the step is being submitted.
+    MySessionFormSubmission.objects.update(
+        form_data=json.dumps([{"photo": replaced}]),
+        image_status=MySessionFormSubmission.IMAGES_VERIFIED,
+    )
+
+    page.steps.update_data(form)
+
+    submission = MySessionFormSubmission.objects.get()
+    assert json.loads(submission.form_data)[0]["photo"] == replaced
+    assert submission.image_status == submission.IMAGES_VERIFIED
+    assert storage.exists(replaced)
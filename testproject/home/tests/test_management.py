@@ -0,0 +1,112 @@
+import datetime
+import json
+import os
+import time
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MySessionFormSubmission
+from home.models import MySubmissionRevision
+from home.models import MyUploadBlob
+
+from .conftest import make_field_step
+
+
+def make_old(*paths):
+    old = time.time() - 48 * 3600
+    for path in paths:
+        os.utime(default_storage.path(path), (old, old))
+
+
+def test_purge_stale_form_drafts(
+    make_form_page, media_root, django_capture_on_commit_callbacks
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    path = default_storage.save("stream_forms/file.txt", ContentFile(b"a"))
+    draft = MySessionFormSubmission.objects.create(
+        page=page,
+        session_key="a" * 32,
+        form_data=json.dumps([{"upload": path}]),
+    )
+    recent = MySessionFormSubmission.objects.create(
+        page=page, session_key="b" * 32, form_data="[{}]"
+    )
+    MySessionFormSubmission.objects.filter(pk=draft.pk).update(
+        last_modification=timezone.now() - datetime.timedelta(days=31)
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("purge_stale_form_drafts", verbosity=0)
+        # Files are deleted once the drafts are.
+        assert default_storage.exists(path)
+
+    assert list(MySessionFormSubmission.objects.all()) == [recent]
+    # Revisions are deleted in bulk, and none is written per draft.
+    assert not MySubmissionRevision.objects.for_submission(draft).exists()
+    assert MySubmissionRevision.objects.for_submission(recent).count() == 1
+    assert not default_storage.exists(path)
+
+
+def test_collect_orphan_form_files(make_form_page, media_root):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    referenced = default_storage.save(
+        "stream_forms/ab/cd/abcd/référence.txt", ContentFile(b"a")
+    )
+    orphan = default_storage.save(
+        "stream_forms/ef/01/ef01/a.txt", ContentFile(b"b")
+    )
+    recent = default_storage.save(
+        "stream_forms/23/45/2345/a.txt", ContentFile(b"c")
+    )
+    legacy = default_storage.save("%s/a.txt" % ("c" * 32), ContentFile(b"d"))
+    make_old(referenced, orphan, legacy)
+    MySessionFormSubmission.objects.create(
+        page=page,
+        session_key="a" * 32,
+        form_data=json.dumps([{"upload": referenced}]),
+    )
+
+    call_command("collect_orphan_form_files", batch_size=2, verbosity=0)
+
+    assert default_storage.exists(referenced)
+    assert not default_storage.exists(orphan)
+    assert default_storage.exists(recent)
+    assert default_storage.exists(legacy)
+
+    call_command(
+        "collect_orphan_form_files", legacy_session_dirs=True, verbosity=0
+    )
+
+    assert default_storage.exists(referenced)
+    assert not default_storage.exists(legacy)
+
+
+def test_collect_orphan_form_files_of_final_submissions(
+    make_form_page, media_root
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    referenced = default_storage.save(
+        "stream_forms/ab/cd/abcd/a b.txt", ContentFile(b"a")
+    )
+    blob = default_storage.save(
+        "stream_forms/ef/01/ef01/a.txt", ContentFile(b"b")
+    )
+    make_old(referenced, blob)
+    # Final submissions store the URL of their files.
+    FormSubmission.objects.create(
+        page=page, form_data={"upload": default_storage.url(referenced)}
+    )
+    # Still counted as used, but its submissions are gone.
+    MyUploadBlob.objects.create(
+        content_hash="a" * 64, path=blob, size=1, references=1
+    )
+
+    call_command("collect_orphan_form_files", verbosity=0)
+
+    assert default_storage.exists(referenced)
+    assert not default_storage.exists(blob)
+    assert not MyUploadBlob.objects.exists()
@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+from wagtail.contrib.forms.models import FormSubmission
+
+from wagtail_flexible_forms.pagination import KeysetPaginator
+
+from .conftest import make_steps
+
+
+@pytest.fixture
+def submissions(make_form_page):
+    page = make_form_page(make_steps(1))
+    now = timezone.now()
+    for index in range(7):
+        submission = FormSubmission.objects.create(page=page, form_data={})
+        # Pairs of submissions share their submit time.
+        FormSubmission.objects.filter(pk=submission.pk).update(
+            submit_time=now - datetime.timedelta(minutes=index // 2)
+        )
+    return FormSubmission.objects.filter(page=page)
+
+
+def get_ids(page):
+    return [submission.pk for submission in page]
+
+
+def test_pages_follow_ordering(submissions, django_assert_num_queries):
+    expected = list(
+        submissions.order_by("-submit_time", "-pk").values_list("pk", flat=True)
+    )
+    paginator = KeysetPaginator(submissions, 3, ordering=("-submit_time",))
+    page = paginator.get_page(None)
+    pages = [get_ids(page)]
+    while page.has_next():
+        with django_assert_num_queries(1):
+            page = paginator.get_page(page.next_page_number())
+        pages.append(get_ids(page))
+    assert pages == [expected[0:3], expected[3:6], expected[6:7]]
+    assert page.number == 3
+
+    with django_assert_num_queries(1):
+        page = paginator.get_page(page.previous_page_number())
+    assert get_ids(page) == expected[3:6]
+    assert page.number == 2
+    page = paginator.get_page(page.previous_page_number())
+    assert get_ids(page) == expected[0:3]
+    assert page.number == 1
+    assert not page.has_previous()
+
+
+@pytest.mark.parametrize("token", ["", "abc", "2-x-e30", "2-a-!!!", "2-a-e30"])
+def test_invalid_token_shows_first_page(submissions, token):
+    paginator = KeysetPaginator(submissions, 3, ordering=("-submit_time",))
+    page = paginator.get_page(token)
+    assert page.number == 1
+    assert not page.has_previous()
+    assert len(page) == 3
+
+
+def test_known_count_is_not_queried(submissions, django_assert_num_queries):
+    paginator = KeysetPaginator(
+        submissions, 3, ordering=("-submit_time",), count=7
+    )
+    with django_assert_num_queries(0):
+        assert paginator.count == 7
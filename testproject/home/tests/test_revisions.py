@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import Client
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MySessionFormSubmission
+from home.models import MySubmissionRevision
+from home.models import MySubmissionRevisionOutbox
+from wagtail_flexible_forms.models import QueuedSubmissionRevisionWriter
+
+from .conftest import make_steps
+
+
+@pytest.fixture
+def submission(make_form_page):
+    page = make_form_page(make_steps(1))
+    return MySessionFormSubmission.objects.create(
+        page=page, session_key="a" * 32, form_data="[{}]"
+    )
+
+
+def set_field(submission, value):
+    submission.form_data = json.dumps([{"field-1": value}])
+    submission.save()
+
+
+def test_revisions_store_deltas(submission):
+    for value in ("a", "b", "c"):
+        set_field(submission, value)
+    revisions = list(
+        MySubmissionRevision.objects.for_submission(submission).order_by(
+            "created_at", "pk"
+        )
+    )
+    assert [revision.delta_depth for revision in revisions] == [0, 1, 2, 3]
+    latest = MySubmissionRevision.objects.get(pk=revisions[-1].pk)
+    assert latest.get_data()["field-1"] == "c"
+
+
+def test_broken_delta_chain_stores_full_snapshot(submission, caplog):
+    set_field(submission, "a")
+    # Deletes the full snapshot the delta was encoded against.
+    MySubmissionRevision.objects.for_submission(submission).filter(
+        delta_depth=0
+    ).delete()
+    set_field(submission, "b")
+    latest = MySubmissionRevision.objects.for_submission(submission).latest(
+        "created_at", "pk"
+    )
+    assert latest.delta_depth == 0
+    assert json.loads(latest.data)["field-1"] == "b"
+    assert "full snapshot" in caplog.text
+
+
+def test_queued_snapshots_are_drained_in_order(make_form_page, monkeypatch):
+    monkeypatch.setattr(
+        MySessionFormSubmission,
+        "revision_writer_class",
+        QueuedSubmissionRevisionWriter,
+    )
+    page = make_form_page(make_steps(1))
+    first = MySessionFormSubmission.objects.create(
+        page=page, session_key="a" * 32, form_data="[{}]"
+    )
+    second = MySessionFormSubmission.objects.create(
+        page=page, session_key="b" * 32, form_data="[{}]"
+    )
+    for value in ("a", "b"):
+        set_field(first, value)
+        set_field(second, value)
+    assert MySubmissionRevisionOutbox.objects.count() == 6
+    assert not MySubmissionRevision.objects.exists()
+
+    # Each batch holds snapshots of both submissions.
+    assert MySubmissionRevisionOutbox.drain(batch_size=4) == 4
+    call_command("drain_revision_outbox", batch_size=4, verbosity=0)
+
+    assert not MySubmissionRevisionOutbox.objects.exists()
+    for submission in (first, second):
+        revisions = list(
+            MySubmissionRevision.objects.for_submission(submission).order_by(
+                "created_at", "pk"
+            )
+        )
+        assert [revision.delta_depth for revision in revisions] == [0, 1, 2]
+        latest = MySubmissionRevision.objects.get(pk=revisions[-1].pk)
+        assert latest.get_data()["field-1"] == "b"
+
+
+def test_latest_revision_uses_submission_index(submission):
+    plan = (
+        MySubmissionRevision.objects.for_submission(submission)
+        .order_by("-created_at")
+        .explain()
+    )
+    assert "home_mysubm_submiss_405f61_idx" in plan
+
+
+def test_final_submission_deletes_revisions_of_its_draft(make_form_page):
+    page = make_form_page(make_steps(1))
+    client = Client()
+    client.get(page.url)
+    session = MySessionFormSubmission.objects.create(
+        page=page,
+        session_key=client.session.session_key,
+        form_data="[{}]",
+    )
+    # Same ID, but another submission class.
+    other = MySubmissionRevision.objects.create(
+        type=MySubmissionRevision.CREATED,
+        submission_ct=ContentType.objects.get_for_model(FormSubmission),
+        submission_id=str(session.pk),
+        data="{}",
+        summary="",
+    )
+    client.post(page.url, {"field-1": "a"})
+    assert not MySessionFormSubmission.objects.exists()
+    # Only the revision recording the deletion of the draft is left.
+    assert list(
+        MySubmissionRevision.objects.exclude(type=MySubmissionRevision.DELETED)
+    ) == [other]
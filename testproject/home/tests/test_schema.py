@@ -0,0 +1,47 @@
+from django import forms
+
+from home.models import MultiStepStreamFormPage
+from wagtail_flexible_forms.cache import form_cache
+from wagtail_flexible_forms.schema import compile_schema
+
+from .conftest import make_steps
+
+
+class CustomForm(forms.Form):
+    pass
+
+
+def test_form_class_is_cached_by_bases(make_form_page):
+    schema = compile_schema(make_form_page(make_steps(1)).form_fields)
+    step = schema.steps[0]
+    form_class = step.get_form_class((forms.Form,))
+    assert step.get_form_class((forms.Form,)) is form_class
+    custom_form_class = step.get_form_class((CustomForm,))
+    assert issubclass(custom_form_class, CustomForm)
+    assert step.get_form_class((forms.Form,)) is form_class
+
+
+def test_schema_is_shared_between_requests(make_form_page):
+    page = make_form_page(make_steps(1))
+    other = MultiStepStreamFormPage.objects.get(pk=page.pk)
+    assert other.get_form_schema() is page.get_form_schema()
+    # E.g. a preview of a new revision.
+    preview = MultiStepStreamFormPage.objects.get(pk=page.pk)
+    preview.form_fields = make_steps(2)
+    assert len(preview.get_form_schema().steps) == 2
+    assert len(page.get_form_schema().steps) == 1
+
+
+def test_schema_cache_is_invalidated_on_publish(make_form_page):
+    page = make_form_page(make_steps(1))
+    page.get_form_schema()
+    assert len(form_cache) == 1
+    page.save_revision().publish()
+    assert len(form_cache) == 0
+
+
+def test_schema_cache_is_bounded(make_form_page, settings):
+    settings.WAGTAIL_FLEXIBLE_FORMS_CACHE_SIZE = 2
+    for step_count in (1, 2, 3):
+        make_form_page(make_steps(step_count)).get_form_schema()
+    assert len(form_cache) == 2
@@ -0,0 +1,99 @@
+import pytest
+from django import forms
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from home.models import MySessionFormSubmission
+
+from .conftest import make_steps
+
+
+def render_step(page, request):
+    context = page.get_context(request)
+    for element in context["markups_and_bound_fields"]:
+        str(element.field)
+    return context
+
+
+def post_step(page, request):
+    context = page.get_context(request)
+    assert context["form"].is_valid()
+    page.steps.update_data(context["form"])
+    request.session.save()
+
+
+@pytest.fixture
+def filled_first_step(make_form_page, make_request):
+    """
+    Returns a function creating a form of ``step_count`` steps, whose first
+    step is filled in, and returning the page and the visitor's session.
+    """
+
+    def filled_first_step(step_count):
+        page = make_form_page(make_steps(step_count))
+        request = make_request(page, "post", {"field-1": "a"})
+        post_step(page, request)
+        # Warms the form cache, shared between requests.
+        render_step(type(page).objects.get(pk=page.pk), make_request(page))
+        return type(page).objects.get(pk=page.pk), request.session
+
+    return filled_first_step
+
+
+def step_queries(page, make_request, session):
+    """
+    Renders then submits the second step, capturing the queries of each.
+    """
+    with CaptureQueriesContext(connection) as get_queries:
+        render_step(page, make_request(page, session=session))
+    page = type(page).objects.get(pk=page.pk)
+    request = make_request(page, "post", {"field-2": "b"}, session=session)
+    with CaptureQueriesContext(connection) as post_queries:
+        post_step(page, request)
+    return len(get_queries), len(post_queries)
+
+
+@pytest.mark.django_db
+def test_step_queries_do_not_depend_on_step_count(
+    filled_first_step, make_request, django_assert_num_queries
+):
+    page, session = filled_first_step(2)
+    get_count, post_count = step_queries(page, make_request, session)
+
+    page, session = filled_first_step(10)
+    with django_assert_num_queries(get_count):
+        render_step(page, make_request(page, session=session))
+    page = type(page).objects.get(pk=page.pk)
+    request = make_request(page, "post", {"field-2": "b"}, session=session)
+    with django_assert_num_queries(post_count):
+        post_step(page, request)
+
+
+@pytest.mark.django_db
+def test_session_submission_is_loaded_once(
+    filled_first_step, make_request, django_assert_num_queries
+):
+    page, session = filled_first_step(10)
+    page.get_context(make_request(page, session=session))
+    # Steps are checked for availability from the loaded submission.
+    with django_assert_num_queries(0):
+        for step in page.steps:
+            assert step.is_available is not None
+            step.get_existing_data()
+
+
+def test_submitted_step_is_validated_once(make_form_page, monkeypatch):
+    page = make_form_page(make_steps(2))
+    cleaned = []
+    clean = forms.CharField.clean
+
+    def count_clean(self, value):
+        cleaned.append(value)
+        return clean(self, value)
+
+    monkeypatch.setattr(forms.CharField, "clean", count_clean)
+    response = Client().post(page.url, {"field-1": "a"})
+    assert response.status_code == 302
+    assert cleaned == ["a"]
+    assert MySessionFormSubmission.objects.get().get_data()["field-1"] == "a"
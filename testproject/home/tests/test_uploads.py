@@ -0,0 +1,191 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from wagtail.contrib.forms.models import FormSubmission
+
+from home.models import MultiStepStreamFormPage
+from home.models import MySessionFormSubmission
+from home.models import WagtailPage
+from wagtail_flexible_forms.uploads import StoredUploadedFile
+from wagtail_flexible_forms.uploads import StreamFormUploadHandler
+from wagtail_flexible_forms.uploads import is_page_request
+
+from .conftest import make_field_step
+from .conftest import make_steps
+
+
+@pytest.fixture(autouse=True)
+def upload_handler(settings, media_root):
+    settings.FILE_UPLOAD_HANDLERS = [
+        "wagtail_flexible_forms.uploads.StreamFormUploadHandler",
+        "django.core.files.uploadhandler.MemoryFileUploadHandler",
+        "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+    ]
+
+
+def stored_files(media_root):
+    return [path for path in media_root.rglob("*") if path.is_file()]
+
+
+def test_other_requests_are_not_looked_up(
+    make_form_page, rf, django_assert_num_queries
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    assert is_page_request(rf.post(page.url))
+    request = rf.post("/django-admin/")
+    assert not is_page_request(request)
+    handler = StreamFormUploadHandler(request)
+    with django_assert_num_queries(0):
+        handler.handle_raw_input(None, request.META, 0, b"")
+    assert handler.page is None
+
+
+def test_upload_is_stored(make_form_page, media_root):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    response = Client().post(
+        page.url, {"upload": SimpleUploadedFile("a.txt", b"abc")}
+    )
+    assert response.status_code == 200
+    url = FormSubmission.objects.get(page=page).form_data["upload"]
+    (file,) = stored_files(media_root)
+    assert file.read_bytes() == b"abc"
+    assert url.endswith(file.relative_to(media_root).as_posix())
+
+
+def test_files_of_kept_complete_draft_are_not_deleted(
+    make_form_page, media_root, monkeypatch
+):
+    create_final_submission = MultiStepStreamFormPage.create_final_submission
+
+    def keep_session(self, request, delete_session=True):
+        return create_final_submission(self, request, delete_session=False)
+
+    monkeypatch.setattr(
+        MultiStepStreamFormPage, "create_final_submission", keep_session
+    )
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    client = Client()
+    client.post(page.url, {"upload": SimpleUploadedFile("a.txt", b"abc")})
+    assert MySessionFormSubmission.objects.get().is_complete
+    (file,) = stored_files(media_root)
+
+    # Replaces the file of the complete draft.
+    client.post(page.url, {"upload": SimpleUploadedFile("b.txt", b"def")})
+    assert file.exists()
+
+
+def test_stored_upload_is_opened_when_read(media_root):
+    path = default_storage.save("a.txt", ContentFile(b"abc"))
+    file = StoredUploadedFile(default_storage, path, "a.txt", None, 3, None)
+    assert file._file is None
+    assert not file.closed
+    assert file.read() == b"abc"
+    file.close()
+    assert file.closed
+
+
+def test_upload_is_deleted_if_csrf_check_fails(make_form_page, media_root):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    response = Client(enforce_csrf_checks=True).post(
+        page.url, {"upload": SimpleUploadedFile("a.txt", b"abc")}
+    )
+    assert response.status_code == 403
+    assert stored_files(media_root) == []
+
+
+def test_other_step_fields_are_not_stored(make_form_page, media_root):
+    form_fields = make_steps(1) + make_field_step("sf_file", "Upload")
+    page = make_form_page(form_fields)
+    Client().post(
+        page.url,
+        {"field-1": "a", "upload": SimpleUploadedFile("a.txt", b"abc")},
+    )
+    assert stored_files(media_root) == []
+
+
+def test_upload_is_aborted_when_too_large(make_form_page, media_root, settings):
+    settings.WAGTAIL_FLEXIBLE_FORMS_MAX_UPLOAD_SIZE = 10
+    page = make_form_page(make_field_step("sf_file", "Upload", required=True))
+    Client().post(
+        page.url, {"upload": SimpleUploadedFile("a.txt", b"a" * 100_000)}
+    )
+    assert stored_files(media_root) == []
+    assert not FormSubmission.objects.filter(page=page).exists()
+
+
+def test_chunked_uploads_do_not_hide_child_pages(
+    make_form_page, monkeypatch, rf
+):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    child = WagtailPage(title="Uploads", slug="uploads")
+    page.add_child(instance=child)
+    monkeypatch.setattr(
+        type(page), "get_chunked_upload_class", lambda self: object
+    )
+    request = rf.get(page.url)
+    routed, _, _ = page.route(request, ["uploads"])
+    assert routed.pk == child.pk
+    routed, _, kwargs = page.route(request, ["-uploads", "abc"])
+    assert routed == page
+    assert kwargs == {"chunked_upload": "abc"}
+
+
+def test_upload_paths_are_sharded_and_unique(make_form_page):
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    path1 = page.get_upload_path("a b.txt")
+    path2 = page.get_upload_path("a b.txt")
+    assert path1 != path2
+    directory, shard1, shard2, key, name = path1.split("/")
+    assert directory == "stream_forms"
+    assert key.startswith(shard1 + shard2)
+    assert name == "a_b.txt"
+
+
+def iter_storage_files(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f"{directory}/{name}"
+    for name in directories:
+        yield from iter_storage_files(storage, f"{directory}/{name}")
+
+
+def test_uploads_are_stored_on_remote_storage(make_form_page, monkeypatch):
+    storage = InMemoryStorage()
+    # Without local paths, like remote storages.
+    assert not storage.exists("stream_forms")
+    monkeypatch.setattr(
+        MultiStepStreamFormPage, "get_storage", lambda self: storage
+    )
+    page = make_form_page(make_field_step("sf_file", "Upload"))
+    Client().post(page.url, {"upload": SimpleUploadedFile("a.txt", b"abc")})
+    url = FormSubmission.objects.get(page=page).form_data["upload"]
+    path = url[len(storage.base_url) :]
+    # Moved along with the completed submission.
+    assert path.startswith(page.get_final_upload_directory() + "/")
+    with storage.open(path) as file:
+        assert file.read() == b"abc"
+    # The file of the draft is deleted once copied.
+    assert list(iter_storage_files(storage, "stream_forms")) == [path]
+
+
+def test_uploads_are_renamed_on_completion(make_form_page, media_root):
+    page = make_form_page(
+        make_field_step("sf_file", "Upload") + make_steps(2)[1:]
+    )
+    client = Client()
+    client.post(page.url, {"upload": SimpleUploadedFile("a.txt", b"abc")})
+    draft_path = MySessionFormSubmission.objects.get().get_data()["upload"]
+    (file,) = stored_files(media_root)
+    inode = file.stat().st_ino
+
+    client.post(page.url, {"field-2": "b"})
+    assert not file.exists()
+    (final_file,) = stored_files(media_root)
+    assert final_file.stat().st_ino == inode
+    url = FormSubmission.objects.get(page=page).form_data["upload"]
+    assert url.endswith(final_file.relative_to(media_root).as_posix())
+    assert page.get_final_upload_directory() in url
+    assert draft_path not in url
@@ -0,0 +1,42 @@
+from django.apps import AppConfig
+
+
+class WagtailFlexibleFormsConfig(AppConfig):
+    name = "wagtail_flexible_forms"
+    verbose_name = "Wagtail Flexible Forms"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+        from django.db.models.signals import post_save
+        from wagtail.models import get_page_models
+
+        from .models import StreamFormMixin
+        from .models import count_created_draft
+        from .models import count_deleted_submission
+        from .models import release_submission_blobs
+
+        # Page models are all registered once apps are ready, and never
+        # change afterwards.
+        self.stream_form_models = [
+            model
+            for model in get_page_models()
+            if issubclass(model, StreamFormMixin)
+        ]
+        # Receivers are only connected to the submission classes of pages
+        # using the matching feature, rather than to every model.
+        for model in self.stream_form_models:
+            if model.get_submission_counter_class() is not None:
+                SessionSubmission = model.get_session_submission_class()
+                post_save.connect(count_created_draft, sender=SessionSubmission)
+                post_delete.connect(
+                    count_deleted_submission, sender=SessionSubmission
+                )
+                post_delete.connect(
+                    count_deleted_submission,
+                    sender=model.get_submission_class(),
+                )
+            if model.get_upload_blob_class() is not None:
+                post_delete.connect(
+                    release_submission_blobs,
+                    sender=model.get_submission_class(),
+                )
@@ -1,6 +1,10 @@
+import typing
+
 from anyascii import anyascii
 from django import forms
+from django.conf import settings
 from django.db.models import BLANK_CHOICE_DASH
+from django.template.defaultfilters import filesizeformat
 from django.utils.dateparse import parse_datetime
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -238,16 +242,125 @@ class DateTimeFieldBlock(OptionalFormFieldBlock):
         icon = "date"
 
 
-class ImageFieldBlock(OptionalFormFieldBlock):
-    field_class = forms.ImageField
+class MaxSizeFileField(forms.FileField):
+    """
+    File field which rejects files larger than ``max_upload_size`` bytes
+    before reading them.
+    """
+
+    default_error_messages: typing.ClassVar[dict] = {
+        "max_size": _("Ensure this file is no larger than %(max_size)s."),
+    }
+
+    def __init__(self, *, max_upload_size=None, **kwargs):
+        self.max_upload_size = max_upload_size
+        super().__init__(**kwargs)
+
+    def validate_upload_size(self, data):
+        if (
+            data
+            and self.max_upload_size is not None
+            and getattr(data, "size", 0) > self.max_upload_size
+        ):
+            raise forms.ValidationError(
+                self.error_messages["max_size"],
+                code="max_size",
+                params={"max_size": filesizeformat(self.max_upload_size)},
+            )
+
+    def to_python(self, data):
+        self.validate_upload_size(data)
+        return super().to_python(data)
+
+
+class MaxSizeImageField(MaxSizeFileField, forms.ImageField):
+    pass
+
+
+class DeferredImageField(MaxSizeImageField):
+    """
+    Image field which only reads the header of uploaded images. Images are
+    fully verified after the step is saved, see
+    ``AbstractSessionFormSubmission.process_images()``.
+    """
+
+    def __init__(self, *, max_dimension=None, **kwargs):
+        self.max_dimension = max_dimension
+        super().__init__(**kwargs)
+
+    def to_python(self, data):
+        from PIL import Image
+
+        self.validate_upload_size(data)
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        try:
+            # Only parses the header, unlike ``verify()``.
+            image = Image.open(f)
+        except Exception as exc:
+            raise forms.ValidationError(
+                self.error_messages["invalid_image"],
+                code="invalid_image",
+            ) from exc
+        f.content_type = Image.MIME.get(image.format or "")
+        if hasattr(f, "seek") and callable(f.seek):
+            f.seek(0)
+        return f
+
+
+class UploadFieldBlock(OptionalFormFieldBlock):
+    """
+    Base block of file upload fields. The maximum size of uploaded files,
+    in bytes, can be set with the ``max_upload_size`` option, and defaults
+    to the ``WAGTAIL_FLEXIBLE_FORMS_MAX_UPLOAD_SIZE`` setting.
+    """
+
+    field_class = MaxSizeFileField
+
+    class Meta:
+        max_upload_size = None
+
+    def get_max_upload_size(self, struct_value):
+        if self.meta.max_upload_size is not None:
+            return self.meta.max_upload_size
+        return getattr(settings, "WAGTAIL_FLEXIBLE_FORMS_MAX_UPLOAD_SIZE", None)
+
+    def get_field_kwargs(self, struct_value):
+        kwargs = super().get_field_kwargs(struct_value)
+        kwargs["max_upload_size"] = self.get_max_upload_size(struct_value)
+        return kwargs
+
+
+class ImageFieldBlock(UploadFieldBlock):
+    """
+    With the ``defer_verification`` option, images are only checked by their
+    header during the request. They are then verified, stripped of their
+    metadata and downscaled to ``max_dimension`` pixels in the background.
+    """
+
+    field_class = MaxSizeImageField
 
     class Meta:
         label = _("Image field")
         icon = "image"
+        defer_verification = False
+        max_dimension = None
+
+    def get_field_class(self, struct_value):
+        if self.meta.defer_verification:
+            return DeferredImageField
+        return super().get_field_class(struct_value)
+
+    def get_field_kwargs(self, struct_value):
+        kwargs = super().get_field_kwargs(struct_value)
+        if self.meta.defer_verification:
+            kwargs["max_dimension"] = self.meta.max_dimension
+        return kwargs
 
 
-class FileFieldBlock(OptionalFormFieldBlock):
-    field_class = forms.FileField
+class FileFieldBlock(UploadFieldBlock):
+    field_class = MaxSizeFileField
 
     class Meta:
         label = _("File field")
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class LRUCache:
+    """
+    A small thread-safe, size-bounded, least recently used cache.
+
+    Keys must be tuples whose first item is the page primary key, so that all
+    entries belonging to a page can be dropped with ``invalidate()``.
+    """
+
+    def __init__(self, setting_name, default_size):
+        self.setting_name = setting_name
+        self.default_size = default_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        return getattr(settings, self.setting_name, self.default_size)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, default_callable):
+        value = self.get(key)
+        if value is None:
+            value = default_callable()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, page_id):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == page_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+form_cache = LRUCache("WAGTAIL_FLEXIBLE_FORMS_CACHE_SIZE", 256)
+"""
+Process-wide cache of compiled form classes.
+"""
+
+
+def get_stream_signature(stream_value) -> str:
+    """
+    Returns a hash of the raw JSON data of a StreamField value. Used to tell
+    apart revisions of the same page, including unsaved previews.
+    """
+    raw = json.dumps(
+        list(stream_value.raw_data), sort_keys=True, cls=DjangoJSONEncoder
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
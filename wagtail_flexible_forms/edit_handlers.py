@@ -1,3 +1,5 @@
+from django.db.models import Count
+from django.db.models import Max
 from django.template.loader import render_to_string
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
@@ -13,10 +15,24 @@ class FormSubmissionsPanel(EditHandler):
             new.heading = _("{} submissions").format(model.get_verbose_name())
         return new
 
-    def render(self):
+    def get_submission_counts(self):
+        """
+        Returns the number of submissions and the time of the latest one,
+        read from the page's submission counter if it has one.
+        """
+        Counter = self.model.get_submission_counter_class()
+        if Counter is not None:
+            counter = Counter.get_for_page(self.instance)
+            return counter.submission_count, counter.last_submit_time
         Submission = self.model.get_submission_class()
-        submissions = Submission.objects.filter(page=self.instance)
-        submission_count = submissions.count()
+        stats = Submission.objects.filter(page=self.instance).aggregate(
+            count=Count("pk"),
+            last=Max("submit_time"),
+        )
+        return stats["count"], stats["last"]
+
+    def render(self):
+        submission_count, last_submit_time = self.get_submission_counts()
 
         if not submission_count:
             return ""
@@ -27,9 +43,7 @@ class FormSubmissionsPanel(EditHandler):
                 {
                     "self": self,
                     "submission_count": submission_count,
-                    "last_submit_time": (
-                        submissions.order_by("submit_time").last().submit_time
-                    ),
+                    "last_submit_time": last_submit_time,
                 },
             )
         )
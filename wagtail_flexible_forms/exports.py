@@ -0,0 +1,160 @@
+import csv
+import datetime
+import json
+import tempfile
+import typing
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.encoding import force_str
+
+from .querysets import with_form_page
+
+
+class Echo:
+    """
+    File-like object which returns what is written to it, so that the
+    ``csv`` module can be used to build a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+class SubmissionExporter:
+    """
+    Exports the submissions of a stream form page to CSV, NDJSON or XLSX, in
+    constant memory.
+
+    Columns are fixed once from the page's ``get_data_fields()``, and
+    submissions are fetched from the database in chunks of ``chunk_size``.
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    XLSX = "xlsx"
+    FORMATS = (CSV, NDJSON, XLSX)
+
+    content_types: typing.ClassVar[dict] = {
+        CSV: "text/csv",
+        NDJSON: "application/x-ndjson",
+        XLSX: (
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        ),
+    }
+
+    chunk_size = 2000
+
+    def __init__(self, form_page, queryset, chunk_size=None):
+        self.form_page = form_page
+        self.queryset = queryset
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.data_fields = form_page.get_data_fields()
+
+    def iter_submissions(self):
+        # All rows belong to the same page: avoid fetching it per row.
+        queryset = with_form_page(self.queryset, self.form_page)
+        return queryset.iterator(chunk_size=self.chunk_size)
+
+    def iter_data(self):
+        """
+        Yields a dictionary of {field name: value} per submission.
+        """
+        for submission in self.iter_submissions():
+            yield submission.get_data()
+
+    def iter_rows(self):
+        """
+        Yields a list of values per submission, in the order of the columns.
+        """
+        names = [name for name, label in self.data_fields]
+        for data in self.iter_data():
+            yield [data.get(name) for name in names]
+
+    def get_headings(self):
+        return [force_str(label) for name, label in self.data_fields]
+
+    @staticmethod
+    def to_text(value):
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return ", ".join(force_str(item) for item in value)
+        return force_str(value)
+
+    @classmethod
+    def to_xlsx(cls, value):
+        if isinstance(value, datetime.datetime):
+            if timezone.is_aware(value):
+                value = timezone.make_naive(value, datetime.timezone.utc)
+            return value
+        if value is None or isinstance(
+            value, (bool, int, float, datetime.date, datetime.time)
+        ):
+            return value
+        return cls.to_text(value)
+
+    def stream_csv(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.get_headings())
+        for row in self.iter_rows():
+            yield writer.writerow([self.to_text(value) for value in row])
+
+    def stream_ndjson(self):
+        for data in self.iter_data():
+            row = {name: data.get(name) for name, label in self.data_fields}
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+    def write_xlsx(self, output):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True, iso_dates=True)
+        worksheet = workbook.create_sheet(title="Sheet1")
+        worksheet.append(self.get_headings())
+        for row in self.iter_rows():
+            worksheet.append([self.to_xlsx(value) for value in row])
+        workbook.save(output)
+
+    def write(self, export_format, output):
+        """
+        Writes the export to ``output``, a binary file-like object.
+        """
+        if export_format == self.XLSX:
+            self.write_xlsx(output)
+            return
+        if export_format == self.NDJSON:
+            lines = self.stream_ndjson()
+        else:
+            lines = self.stream_csv()
+        for line in lines:
+            output.write(line.encode("utf-8"))
+
+    def as_response(self, export_format, filename):
+        """
+        Returns a streaming HTTP response of the export. XLSX workbooks can
+        not be written progressively, so they are spooled to a temporary file
+        rather than kept in memory.
+        """
+        content_type = self.content_types[export_format]
+        filename = f"{filename}.{export_format}"
+        if export_format == self.XLSX:
+            # Closed by the response once sent.
+            output = tempfile.TemporaryFile()  # noqa: SIM115
+            self.write_xlsx(output)
+            output.seek(0)
+            return FileResponse(
+                output,
+                as_attachment=True,
+                content_type=content_type,
+                filename=filename,
+            )
+        if export_format == self.NDJSON:
+            stream = self.stream_ndjson()
+        else:
+            stream = self.stream_csv()
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
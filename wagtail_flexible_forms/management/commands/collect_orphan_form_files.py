@@ -0,0 +1,245 @@
+import datetime
+import json
+import re
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from wagtail.models import Page
+
+from wagtail_flexible_forms.models import AbstractChunkedUpload
+from wagtail_flexible_forms.models import AbstractSessionFormSubmission
+from wagtail_flexible_forms.models import AbstractUploadBlob
+from wagtail_flexible_forms.models import StreamFormMixin
+from wagtail_flexible_forms.uploads import delete_upload
+from wagtail_flexible_forms.uploads import find_upload_path
+
+
+# Uploads are stored in the ``upload_directory`` of each form page. Earlier
+# versions stored them in a directory named after the session key, at the
+# root of the storage, which are only scanned with ``--legacy-session-dirs``.
+SESSION_DIRECTORY_RE = re.compile(r"^[a-z0-9]{32,40}$")
+
+
+def iter_strings(value):
+    """
+    Yields the strings nested in ``value``, decoded from JSON if it is a
+    string holding JSON.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            yield value
+            return
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_strings(item)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete uploaded files of stream forms which are no longer referenced "
+        "by any draft or final submission."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Only delete files older than this many hours.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of threads deleting files.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows fetched at a time to find references.",
+        )
+        parser.add_argument(
+            "--legacy-session-dirs",
+            action="store_true",
+            help=(
+                "Also scan the directories at the root of the storage which "
+                "are named like session keys, where earlier versions stored "
+                "uploads. Only use it if no other application stores files "
+                "in such directories."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the files which would be deleted.",
+        )
+
+    def get_form_pages(self):
+        for model in apps.get_models():
+            if issubclass(model, StreamFormMixin) and issubclass(model, Page):
+                yield from model.objects.all()
+
+    def get_reference_sources(self, pages):
+        """
+        Returns the ``(queryset, field name)`` pairs whose values may
+        reference uploaded files: the paths of chunked uploads (with their
+        chunks), and the data of drafts and final submissions of ``pages``.
+        Values are searched rather than the current form fields, which may
+        have changed since. Upload blobs are not sources, as they are only
+        used through drafts and final submissions.
+        """
+        sources = []
+        for model in apps.get_models():
+            if issubclass(model, AbstractChunkedUpload):
+                sources.append((model.objects.all(), "path"))
+                sources.append((model.objects.all(), "parts"))
+            if issubclass(model, AbstractSessionFormSubmission):
+                sources.append((model.objects.all(), "form_data"))
+        page_ids_by_class: dict[typing.Any, list] = {}
+        for page in pages:
+            Submission = page.get_submission_class()
+            page_ids_by_class.setdefault(Submission, []).append(page.pk)
+        for Submission, page_ids in page_ids_by_class.items():
+            sources.append(
+                (Submission.objects.filter(page_id__in=page_ids), "form_data")
+            )
+        return sources
+
+    def get_referenced(self, sources, directories, batch_size):
+        """
+        Returns the set of paths below ``directories`` referenced by
+        ``sources``, reading each source once. Final submissions store the
+        URLs of their files, see ``find_upload_path()``.
+        """
+        referenced = set()
+        for queryset, field_name in sources:
+            values = queryset.values_list(field_name, flat=True).iterator(
+                chunk_size=batch_size
+            )
+            for value in values:
+                for text in iter_strings(value):
+                    path = find_upload_path(text, directories)
+                    if path is not None:
+                        referenced.add(path)
+        return referenced
+
+    def get_blobs(self, batch_size):
+        """
+        Returns the upload blobs, as a dictionary of path: ``(model,
+        references)``.
+        """
+        blobs = {}
+        for model in apps.get_models():
+            if issubclass(model, AbstractUploadBlob):
+                for path, references in model.objects.values_list(
+                    "path", "references"
+                ).iterator(chunk_size=batch_size):
+                    blobs[path] = (model, references)
+        return blobs
+
+    def iter_files(self, storage, directory):
+        try:
+            subdirectories, files = storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for name in files:
+            yield f"{directory}/{name}"
+        for name in subdirectories:
+            yield from self.iter_files(storage, f"{directory}/{name}")
+
+    def iter_orphans(self, storage, directories, referenced, before):
+        """
+        Yields the files of ``directories`` older than ``before`` which are
+        not ``referenced``.
+        """
+        for directory in directories:
+            for path in self.iter_files(storage, directory):
+                if path in referenced:
+                    continue
+                if storage.get_modified_time(path) < before:
+                    yield path
+
+    def delete_blob(self, blobs, path):
+        """
+        Deletes the upload blob of the file at ``path``, if any, unless it
+        was used again since it was read. Returns whether the file can be
+        deleted.
+        """
+        if path not in blobs:
+            return True
+        Blob, references = blobs[path]
+        deleted, _by_model = Blob.objects.filter(
+            path=path, references=references
+        ).delete()
+        return bool(deleted)
+
+    def delete(self, storage, path):
+        delete_upload(storage, path)
+        return path
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(hours=options["min_age"])
+        pages = list(self.get_form_pages())
+        storages = []
+        upload_directories: list[set] = []
+        for page in pages:
+            storage = page.get_storage()
+            if storage not in storages:
+                storages.append(storage)
+                upload_directories.append(set())
+            index = storages.index(storage)
+            upload_directories[index].add(page.upload_directory)
+        if options["legacy_session_dirs"]:
+            for storage, directories in zip(storages, upload_directories):
+                root_directories, _files = storage.listdir("")
+                directories.update(
+                    directory
+                    for directory in root_directories
+                    if SESSION_DIRECTORY_RE.match(directory)
+                )
+        # Blobs are read first: blobs used by submissions saved since then
+        # have more references, and are kept.
+        blobs = self.get_blobs(options["batch_size"])
+        sources = self.get_reference_sources(pages)
+        referenced = self.get_referenced(
+            sources,
+            set().union(*upload_directories),
+            options["batch_size"],
+        )
+
+        count = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for storage, directories in zip(storages, upload_directories):
+                orphans = self.iter_orphans(
+                    storage, sorted(directories), referenced, before
+                )
+                if options["dry_run"]:
+                    for path in orphans:
+                        self.stdout.write(path)
+                        count += 1
+                    continue
+                orphans = (
+                    path for path in orphans if self.delete_blob(blobs, path)
+                )
+                for path in executor.map(
+                    partial(self.delete, storage), orphans
+                ):
+                    if options["verbosity"] >= 2:
+                        self.stdout.write(f"Deleted {path}")
+                    count += 1
+
+        if options["verbosity"] >= 1:
+            verb = "found" if options["dry_run"] else "deleted"
+            self.stdout.write(f"{count} orphan file(s) {verb}.")
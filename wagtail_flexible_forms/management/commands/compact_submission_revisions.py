@@ -0,0 +1,64 @@
+import datetime
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from wagtail_flexible_forms.models import AbstractSubmissionRevision
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode submission revisions as deltas between full snapshots, "
+        "and delete the oldest revisions above a per-submission limit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            help="Number of revisions to keep per submission. "
+            "Defaults to keeping all revisions.",
+        )
+        parser.add_argument(
+            "--inactive-days",
+            type=int,
+            default=0,
+            help="Only compact submissions with no revision in this many days.",
+        )
+
+    def get_revision_models(self):
+        return [
+            model
+            for model in apps.get_models()
+            if issubclass(model, AbstractSubmissionRevision)
+        ]
+
+    def handle(self, *args, **options):
+        keep = options["keep"]
+        cutoff = timezone.now() - datetime.timedelta(
+            days=options["inactive_days"]
+        )
+        for model in self.get_revision_models():
+            submissions = (
+                model.objects.order_by()
+                .values_list("submission_ct_id", "submission_id")
+                .annotate(last_revision=Max("created_at"))
+                .filter(last_revision__lte=cutoff)
+            )
+            compacted = deleted = 0
+            for (
+                submission_ct_id,
+                submission_id,
+                _last,
+            ) in submissions.iterator():
+                deleted += model.compact(
+                    submission_ct_id, submission_id, keep=keep
+                )
+                compacted += 1
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    f"{model._meta.label}: compacted {compacted} "
+                    f"submission(s), deleted {deleted} revision(s)."
+                )
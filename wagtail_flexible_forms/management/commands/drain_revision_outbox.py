@@ -0,0 +1,59 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from wagtail_flexible_forms.models import AbstractSubmissionRevisionOutbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Turn queued submission snapshots into revisions, see "
+        "QueuedSubmissionRevisionWriter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of snapshots processed per transaction.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, waiting for new snapshots.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty, with --loop.",
+        )
+
+    def get_outbox_models(self):
+        return [
+            model
+            for model in apps.get_models()
+            if issubclass(model, AbstractSubmissionRevisionOutbox)
+        ]
+
+    def drain(self, batch_size):
+        total = 0
+        for model in self.get_outbox_models():
+            while True:
+                count = model.drain(batch_size)
+                total += count
+                if count < batch_size:
+                    break
+        return total
+
+    def handle(self, *args, **options):
+        while True:
+            count = self.drain(options["batch_size"])
+            if options["verbosity"] >= 1 and (count or not options["loop"]):
+                self.stdout.write(f"Processed {count} snapshot(s).")
+            if not options["loop"]:
+                break
+            if not count:
+                time.sleep(options["interval"])
@@ -0,0 +1,82 @@
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from wagtail.models import Page
+
+from wagtail_flexible_forms.exports import SubmissionExporter
+from wagtail_flexible_forms.models import StreamFormMixin
+
+
+class Command(BaseCommand):
+    help = "Export the submissions of a stream form page to a file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("page_id", type=int)
+        parser.add_argument(
+            "--format",
+            choices=SubmissionExporter.FORMATS,
+            default=SubmissionExporter.CSV,
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to. Defaults to standard output.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SubmissionExporter.chunk_size,
+            help="Number of submissions fetched from the database at a time.",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="FIELD=VALUE",
+            help="Only export final submissions with this answer. Requires a "
+            "submission value class. Can be repeated.",
+        )
+        parser.add_argument(
+            "--drafts",
+            action="store_true",
+            help="Export session submissions (drafts) instead of final "
+            "submissions.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            page = Page.objects.get(pk=options["page_id"]).specific
+        except Page.DoesNotExist:
+            raise CommandError(f"Page {options['page_id']} does not exist.")
+        if not isinstance(page, StreamFormMixin):
+            raise CommandError(f"Page {page.pk} is not a stream form.")
+
+        if options["drafts"]:
+            Submission = page.get_session_submission_class()
+        else:
+            Submission = page.get_submission_class()
+        queryset = Submission.objects.filter(page=page).order_by(
+            "submit_time", "pk"
+        )
+        for value_filter in options["filter"]:
+            field_name, separator, value = value_filter.partition("=")
+            if not separator or options["drafts"]:
+                raise CommandError(
+                    "Filters must be FIELD=VALUE, on final submissions."
+                )
+            try:
+                queryset = page.filter_submissions_by_value(
+                    queryset, field_name, value
+                )
+            except ImproperlyConfigured as error:
+                raise CommandError(error)
+        exporter = SubmissionExporter(
+            page, queryset, chunk_size=options["chunk_size"]
+        )
+
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                exporter.write(options["format"], output)
+        else:
+            exporter.write(options["format"], sys.stdout.buffer)
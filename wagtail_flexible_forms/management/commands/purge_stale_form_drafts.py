@@ -0,0 +1,160 @@
+import datetime
+import time
+from functools import partial
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from wagtail_flexible_forms.models import AbstractChunkedUpload
+from wagtail_flexible_forms.models import AbstractSessionFormSubmission
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete incomplete session submissions (drafts) which have not been "
+        "modified for a number of days, with their revisions and files, and "
+        "unfinished chunked uploads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Delete drafts not modified in this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of drafts deleted per transaction.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the drafts which would be deleted.",
+        )
+
+    def get_submission_models(self):
+        return [
+            model
+            for model in apps.get_models()
+            if issubclass(model, AbstractSessionFormSubmission)
+        ]
+
+    def delete_chunked_uploads(self, model, before):
+        """
+        Deletes the uploads of ``model`` not modified since ``before``, which
+        were never completed or never submitted. Returns their number.
+        """
+        pages = {}
+        count = 0
+        for upload in model.objects.filter(last_modification__lt=before):
+            if upload.page_id not in pages:
+                pages[upload.page_id] = upload.page.specific
+            with transaction.atomic():
+                upload.discard(pages[upload.page_id])
+            count += 1
+        return count
+
+    def delete_batch(self, model, before, batch_size):
+        """
+        Deletes a batch of stale drafts of ``model``, bypassing the
+        ``post_delete`` signals which would otherwise run per draft: their
+        revisions are deleted in bulk, and their submission counters are
+        updated once per page. Their files are released once the deletion is
+        committed. Returns the number of deleted drafts, revisions and files.
+        """
+        SubmissionRevision = model.get_revision_class()
+        Outbox = model.get_revision_outbox_class()
+        with transaction.atomic():
+            drafts = list(
+                model.objects.stale(before)
+                .select_for_update(skip_locked=True)
+                .order_by("last_modification", "pk")
+                .with_form_page()[:batch_size]
+            )
+            if not drafts:
+                return 0, 0, 0
+            pages: dict[int, list] = {}
+            files: list[tuple] = []
+            for draft in drafts:
+                page = draft.form_page
+                pages.setdefault(page.pk, [page, 0])[1] += 1
+                files.extend((page, path) for path in draft.get_all_files())
+            ids = [str(draft.pk) for draft in drafts]
+            filters = {
+                "submission_ct": ContentType.objects.get_for_model(model),
+                "submission_id__in": ids,
+            }
+            revisions = SubmissionRevision.objects.filter(**filters)
+            revisions_count = revisions._raw_delete(revisions.db)
+            if Outbox is not None:
+                outbox = Outbox.objects.filter(**filters)
+                outbox._raw_delete(outbox.db)
+            queryset = model.objects.filter(pk__in=ids)
+            drafts_count = queryset._raw_delete(queryset.db)
+            for page, count in pages.values():
+                page.update_submission_counter(drafts=-count)
+            # Files are only deleted once the drafts are gone for sure.
+            transaction.on_commit(partial(self.release_files, files))
+        return drafts_count, revisions_count, len(files)
+
+    def release_files(self, files):
+        for page, path in files:
+            page.release_upload(path)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options["days"])
+        for model in apps.get_models():
+            if not issubclass(model, AbstractChunkedUpload):
+                continue
+            if options["dry_run"]:
+                count = model.objects.filter(
+                    last_modification__lt=before
+                ).count()
+                verb = "would be deleted"
+            else:
+                count = self.delete_chunked_uploads(model, before)
+                verb = "deleted"
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    f"{model._meta.label}: {count} upload(s) {verb}."
+                )
+        for model in self.get_submission_models():
+            if options["dry_run"]:
+                count = model.objects.stale(before).count()
+                self.stdout.write(
+                    f"{model._meta.label}: {count} draft(s) would be deleted."
+                )
+                continue
+            start = time.monotonic()
+            drafts = revisions = files = 0
+            while True:
+                counts = self.delete_batch(model, before, options["batch_size"])
+                drafts += counts[0]
+                revisions += counts[1]
+                files += counts[2]
+                if counts[0] < options["batch_size"]:
+                    break
+                if options["verbosity"] >= 2:
+                    self.stdout.write(f"{drafts} draft(s) deleted...")
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+            elapsed = time.monotonic() - start
+            if options["verbosity"] >= 1:
+                rate = drafts / elapsed if elapsed else 0
+                self.stdout.write(
+                    f"{model._meta.label}: deleted {drafts} draft(s), "
+                    f"{revisions} revision(s) and {files} file(s) "
+                    f"in {elapsed:.1f}s ({rate:.0f} drafts/s)."
+                )
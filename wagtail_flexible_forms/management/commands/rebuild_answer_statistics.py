@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from wagtail.models import Page
+
+from wagtail_flexible_forms.models import StreamFormMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the answers to the choice fields of the final submissions of "
+        "stream form pages which have an answer statistic class."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "page_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the pages to recount. Defaults to all pages.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of submissions decoded at a time.",
+        )
+
+    def get_form_pages(self, page_ids):
+        for model in apps.get_models():
+            if not issubclass(model, StreamFormMixin) or not issubclass(
+                model, Page
+            ):
+                continue
+            if model.get_answer_statistic_class() is None:
+                continue
+            pages = model.objects.all()
+            if page_ids:
+                pages = pages.filter(pk__in=page_ids)
+            yield from pages.iterator()
+
+    def handle(self, *args, **options):
+        for page in self.get_form_pages(options["page_ids"]):
+            count = page.get_answer_statistic_class().rebuild(
+                page, batch_size=options["batch_size"]
+            )
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"{page}: counted {count} submission(s).")
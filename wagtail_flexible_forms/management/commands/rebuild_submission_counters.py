@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wagtail.models import Page
+
+from wagtail_flexible_forms.models import StreamFormMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the drafts and submissions of stream form pages which have "
+        "a submission counter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "page_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the pages to recount. Defaults to all pages.",
+        )
+
+    def get_form_pages(self, page_ids):
+        for model in apps.get_models():
+            if not issubclass(model, StreamFormMixin) or not issubclass(
+                model, Page
+            ):
+                continue
+            if model.get_submission_counter_class() is None:
+                continue
+            pages = model.objects.all()
+            if page_ids:
+                pages = pages.filter(pk__in=page_ids)
+            yield from pages.iterator()
+
+    def handle(self, *args, **options):
+        count = 0
+        for page in self.get_form_pages(options["page_ids"]):
+            with transaction.atomic():
+                counter = page.get_submission_counter_class().rebuild(page)
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    f"{page}: {counter.draft_count} draft(s), "
+                    f"{counter.submission_count} submission(s)."
+                )
+            count += 1
+        if options["verbosity"] >= 1:
+            self.stdout.write(f"{count} counter(s) rebuilt.")
@@ -0,0 +1,65 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wagtail.models import Page
+
+from wagtail_flexible_forms.models import StreamFormMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Index the values of the final submissions of stream form pages "
+        "which have a submission value class."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "page_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the pages to index. Defaults to all pages.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of submissions indexed per query.",
+        )
+
+    def get_form_pages(self, page_ids):
+        for model in apps.get_models():
+            if not issubclass(model, StreamFormMixin) or not issubclass(
+                model, Page
+            ):
+                continue
+            if model.get_submission_value_class() is None:
+                continue
+            pages = model.objects.all()
+            if page_ids:
+                pages = pages.filter(pk__in=page_ids)
+            yield from pages.iterator()
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for page in self.get_form_pages(options["page_ids"]):
+            Value = page.get_submission_value_class()
+            submissions = (
+                page.get_submission_class()
+                .objects.filter(page=page)
+                .order_by("pk")
+            )
+            count = 0
+            with transaction.atomic():
+                Value.objects.filter(page_id=page.pk).delete()
+                batch = []
+                for submission in submissions.iterator(chunk_size=batch_size):
+                    submission.page = page
+                    batch.append(submission)
+                    if len(batch) >= batch_size:
+                        Value.index_submissions(page, batch)
+                        count += len(batch)
+                        batch = []
+                Value.index_submissions(page, batch)
+                count += len(batch)
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"{page}: indexed {count} submission(s).")
@@ -1,8 +1,14 @@
 import datetime
+import hashlib
+import io
 import json
+import logging
 import typing
+import uuid
+from collections import Counter
 from collections import OrderedDict
 from collections import namedtuple
+from functools import partial
 from importlib import import_module
 from itertools import zip_longest
 from pathlib import Path
@@ -11,15 +17,24 @@ from django import forms
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import File
 from django.core.files.storage import default_storage
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.db import close_old_connections
 from django.db import models
+from django.db import transaction
 from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Greatest
 from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.http import Http404
 from django.http import HttpResponseRedirect
 from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.safestring import SafeData
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
@@ -27,10 +42,28 @@ from wagtail.contrib.forms.models import AbstractEmailForm
 from wagtail.contrib.forms.models import AbstractForm
 from wagtail.contrib.forms.models import AbstractFormSubmission
 from wagtail.contrib.forms.models import FormSubmission
-from wagtail.contrib.forms.views import SubmissionsListView
+from wagtail.models import Page
+from wagtail.signals import page_published
+from wagtail.url_routing import RouteResult
 
-from .blocks import FormFieldBlock
+from .blocks import DeferredImageField
 from .blocks import FormStepBlock
+from .cache import form_cache
+from .querysets import with_form_page
+from .schema import get_form_schema
+from .uploads import ConcatenatedReader
+from .uploads import StoredUploadedFile
+from .uploads import delete_upload
+from .uploads import find_upload_path
+from .uploads import get_content_hash
+from .uploads import get_image_executor
+from .uploads import move_upload
+from .uploads import process_image
+from .views import ChunkedUploadView
+from .views import StreamFormSubmissionsListView
+
+
+logger = logging.getLogger(__name__)
 
 
 Element = namedtuple("Element", ["type", "block", "field"])
@@ -51,16 +84,28 @@ def get_form_enctype(form: forms.Form):
 
 
 class Step:
-    def __init__(self, steps, index, struct_child):
+    def __init__(self, steps, schema):
         self.steps = steps
-        self.index = index
-        block = getattr(struct_child, "block", None)
+        self.schema = schema
+        self.index = schema.index
+        self.name = schema.name
+
+    @cached_property
+    def form_fields(self):
+        """
+        The deserialized stream of blocks in this step, used for rendering.
+        """
+        stream_value = self.steps.form_fields
+        if not self.steps.schema.has_steps:
+            return stream_value
+        # Only convert this step, rather than every step of the stream.
+        raw_child = stream_value.raw_data[self.index]
+        block = stream_value.stream_block.child_blocks[raw_child["type"]]
         if isinstance(block, FormStepBlock):
-            self.name = struct_child.value["name"]
-            self.form_fields = struct_child.value["form_fields"]
-        else:
-            self.name = ""
-            self.form_fields = struct_child
+            return block.child_blocks["form_fields"].to_python(
+                raw_child["value"].get("form_fields") or []
+            )
+        return []
 
     @property
     def index1(self):
@@ -71,21 +116,20 @@ class Step:
         return "%s?step=%s" % (self.steps.page.url, self.index1)
 
     def get_form_fields(self):
-        form_fields = OrderedDict()
-        field_blocks = self.form_fields
-        for struct_child in field_blocks:
-            block = struct_child.block
-            if isinstance(block, FormFieldBlock):
-                struct_value = struct_child.value
-                field_name = block.get_slug(struct_value)
-                form_fields[field_name] = block.get_field(struct_value)
-        return form_fields
+        return OrderedDict(self.get_form_class().base_fields)
 
     def get_form_class(self):
-        return type(
-            "WagtailForm",
-            self.steps.page.get_form_class_bases(),
-            self.get_form_fields(),
+        """
+        Returns the form class for this step. Form classes are compiled once
+        per page revision and shared between requests, see ``get_form_schema``.
+        """
+        return self.schema.get_form_class(
+            self.steps.page.get_form_class_bases()
+        )
+
+    def get_form_enctype(self):
+        return self.schema.get_form_enctype(
+            self.steps.page.get_form_class_bases()
         )
 
     def get_markups_and_bound_fields(self, form):
@@ -95,11 +139,10 @@ class Step:
         1: The Wagtail block object.
         2: Field name (or None for non-fields i.e. markup).
         """
-        for struct_child in self.form_fields:
-            block = struct_child.block
-            if isinstance(block, FormFieldBlock):
-                struct_value = struct_child.value
-                field_name = block.get_slug(struct_value)
+        for struct_child, field_name in zip(
+            self.form_fields, self.schema.slugs
+        ):
+            if field_name is not None:
                 yield Element("field", struct_child, form[field_name])
             else:
                 yield Element("markup", struct_child, None)
@@ -147,17 +190,16 @@ class Step:
 
     def get_existing_data(self, raw=False):
         data = self.steps.get_existing_data()[self.index]
-        fields = self.get_form_fields()
         if not raw:
 
             class FakeField:
                 storage = self.steps.get_storage()
 
-            for field_name, value in data.items():
-                if field_name in fields and isinstance(
-                    fields[field_name], forms.FileField
-                ):
-                    data[field_name] = FieldFile(None, FakeField, value)
+            for field_name in self.schema.file_fields:
+                if field_name in data:
+                    data[field_name] = FieldFile(
+                        None, FakeField, data[field_name]
+                    )
         return data
 
     @property
@@ -184,18 +226,10 @@ class Steps(list):
         # TODO: Make it possible to change the `form_fields` attribute.
         self.form_fields = page.form_fields
         self.request = request
-        has_steps = any(
-            isinstance(struct_child.block, FormStepBlock)
-            for struct_child in self.form_fields
-        )
-        if has_steps:
-            steps = [
-                Step(self, i, form_field)
-                for i, form_field in enumerate(self.form_fields)
-            ]
-        else:
-            steps = [Step(self, 0, self.form_fields)]
-        super().__init__(steps)
+        self._session_submission = None
+        self._existing_data = None
+        self.schema = page.get_form_schema()
+        super().__init__(Step(self, schema) for schema in self.schema.steps)
 
     def clamp_index(self, index: int):
         if index < 0:
@@ -218,9 +252,11 @@ class Steps(list):
     def current(self, new_index: int):
         if not isinstance(new_index, int):
             raise TypeError("Use an integer to set the new current step.")
-        self.request.session[self.page.current_step_session_key] = (
-            self.clamp_index(new_index)
-        )
+        key = self.page.current_step_session_key
+        new_index = self.clamp_index(new_index)
+        # Avoid modifying (and therefore saving) the session needlessly.
+        if self.request.session.get(key, 0) != new_index:
+            self.request.session[key] = new_index
 
     def forward(self, increment: int = 1):
         self.current = self.current_index + increment
@@ -229,15 +265,33 @@ class Steps(list):
         self.current = self.current_index - increment
 
     def get_session_submission(self):
-        return self.page.get_session_submission(self.request)
+        """
+        Returns the session submission of the current request. It is only
+        looked up once per request, and the same instance is returned on
+        subsequent calls.
+        """
+        if self._session_submission is None:
+            self._session_submission = self.page.get_session_submission(
+                self.request
+            )
+        return self._session_submission
 
     def get_existing_data(self):
-        submission = self.get_session_submission()
-        data = [] if submission is None else json.loads(submission.form_data)
-        length_difference = len(self) - len(data)
-        if length_difference > 0:
-            data.extend([{}] * length_difference)
-        return data
+        """
+        Returns a list of step data dictionaries. ``form_data`` is decoded
+        once per request; each call returns fresh dictionaries which can be
+        safely modified by the caller.
+        """
+        if self._existing_data is None:
+            submission = self.get_session_submission()
+            data = (
+                [] if submission is None else json.loads(submission.form_data)
+            )
+            length_difference = len(self) - len(data)
+            if length_difference > 0:
+                data.extend({} for _i in range(length_difference))
+            self._existing_data = data
+        return [dict(step_data) for step_data in self._existing_data]
 
     def get_current_form(self):
         request = self.request
@@ -248,53 +302,149 @@ class Steps(list):
             else:
                 return self.current.get_form_class()(
                     request.POST,
-                    request.FILES,
+                    self.get_files(),
                     initial=self.current.get_existing_data(),
                 )
         return self.current.get_form_class()(
             initial=self.current.get_existing_data()
         )
 
+    def get_files(self):
+        """
+        Returns the files submitted for the current step: ``request.FILES``,
+        and the complete chunked uploads whose IDs are submitted in the
+        ``<field>__upload_id`` fields, see ``ChunkedUploadView``.
+        """
+        files = self.request.FILES
+        ChunkedUpload = self.page.get_chunked_upload_class()
+        if ChunkedUpload is None:
+            return files
+        upload_ids = {}
+        for name in self.current.schema.file_fields:
+            value = self.request.POST.get(f"{name}__upload_id")
+            if not value or name in files:
+                continue
+            try:
+                upload_ids[uuid.UUID(value)] = name
+            except ValueError:
+                continue
+        owner = ChunkedUpload.get_owner_filters(self.request)
+        if not upload_ids or owner is None:
+            return files
+        files = files.copy()
+        storage = self.get_storage()
+        for upload in ChunkedUpload.objects.filter(
+            pk__in=upload_ids, page=self.page, **owner
+        ).exclude(path=""):
+            if upload.field_name == upload_ids[upload.pk]:
+                files[upload.field_name] = upload.get_uploaded_file(storage)
+        return files
+
     def get_storage(self):
         return self.page.get_storage()
 
     def save_files(self, form):
+        """
+        Saves the uploaded files of ``form``, and returns the images to be
+        processed later as ``(path, max_dimension)`` pairs.
+        """
         submission = self.get_session_submission()
+        existing_data = self.get_existing_data()[self.current_index]
+        deferred_images = []
         for name, field in form.fields.items():
             if isinstance(field, forms.FileField):
                 file = form.cleaned_data[name]
                 if file == form.initial.get(name, ""):  # Nothing submitted.
-                    form.cleaned_data[name] = file.name
+                    # The file may have been replaced since the form was
+                    # built, see ``lock_session_submission()``.
+                    form.cleaned_data[name] = existing_data.get(name, file.name)
                     continue
                 if submission is not None:
                     submission.delete_file(name)
                 if not file:  # 'Clear' was checked.
                     form.cleaned_data[name] = ""
                     continue
-                directory = self.request.session.session_key
-                storage = self.get_storage()
-                Path(storage.path(directory)).mkdir(parents=True, exist_ok=True)
-                path = storage.get_available_name(
-                    str(Path(directory) / file.name)
-                )
-                with storage.open(path, "wb+") as destination:
-                    for chunk in file.chunks():
-                        destination.write(chunk)
-                form.cleaned_data[name] = path
+                form.cleaned_data[name] = self.page.store_upload(file)
+                if getattr(file, "chunked_upload", None) is not None:
+                    # The file is now used by the draft.
+                    file.chunked_upload.delete()
+                if isinstance(field, DeferredImageField):
+                    deferred_images.append(
+                        (form.cleaned_data[name], field.max_dimension)
+                    )
+        return deferred_images
+
+    def discard_uploads(self):
+        """
+        Deletes the files written by ``StreamFormUploadHandler`` for a
+        submission which was not saved.
+        """
+        for file in self.request.FILES.values():
+            if isinstance(file, StoredUploadedFile):
+                file.delete()
+
+    def ensure_session(self):
+        """
+        Attaches the session submission of an anonymous user to a session,
+        creating the session if it was deferred by ``defer_session``.
+        """
+        submission = self.get_session_submission()
+        if submission.user_id is not None or submission.session_key:
+            return
+        if not self.request.session.session_key:
+            self.request.session.create()
+        submission.session_key = self.request.session.session_key
+
+    def lock_session_submission(self):
+        """
+        Locks the session submission until the end of the transaction, and
+        reloads its data, as images may have been replaced in the background
+        since it was loaded, see ``process_images()``.
+        """
+        submission = self.get_session_submission()
+        if submission is None or submission.pk is None:
+            return
+        current = (
+            type(submission)
+            .objects.select_for_update()
+            .filter(pk=submission.pk)
+            .values_list("form_data", "image_status")
+            .first()
+        )
+        if current is not None:
+            submission.form_data, submission.image_status = current
+            self._existing_data = None
 
-    def update_data(self):
-        form = self.get_current_form()
+    def update_data(self, form=None):
+        """
+        Saves the data of the current step. ``form`` is the bound form of the
+        current step, as returned by ``get_current_form()``; pass it in when it
+        has already been validated so that it is not bound and cleaned twice.
+        """
+        if form is None:
+            form = self.get_current_form()
         if form.is_valid():
-            form_data = self.get_existing_data()
-            self.save_files(form)
-            form_data[self.current_index] = form.cleaned_data
-            form_data = json.dumps(form_data, cls=StreamFormJSONEncoder)
-            is_complete = self.current.is_last
-            submission = self.get_session_submission()
-            submission.form_data = form_data
-            if not submission.is_complete and is_complete:
-                submission.status = submission.COMPLETE
-            submission.save()
+            self.ensure_session()
+            with transaction.atomic():
+                self.lock_session_submission()
+                form_data = self.get_existing_data()
+                deferred_images = self.save_files(form)
+                form_data[self.current_index] = form.cleaned_data
+                form_data = json.dumps(form_data, cls=StreamFormJSONEncoder)
+                is_complete = self.current.is_last
+                submission = self.get_session_submission()
+                submission.form_data = form_data
+                if not submission.is_complete and is_complete:
+                    submission.status = submission.COMPLETE
+                if deferred_images:
+                    submission.image_status = submission.IMAGES_PENDING
+                submission.save()
+                if deferred_images and not is_complete:
+                    # Images of the last step are processed before the final
+                    # submission is created, see ``create_final_submission()``.
+                    submission.schedule_image_processing(deferred_images)
+            # Decoded lazily from the updated submission when next needed.
+            self._existing_data = None
             if is_complete:
                 self.current = 0
             else:
@@ -303,11 +453,139 @@ class Steps(list):
         return False
 
 
+class SessionFormSubmissionQuerySet(models.QuerySet):
+    def with_form_page(self, page=None):
+        """
+        Resolves the specific page of each submission once per page rather
+        than once per submission, see ``querysets.with_form_page()``.
+        """
+        return with_form_page(self, page)
+
+    def stale(self, before):
+        """
+        Drafts which were never completed and not modified since ``before``.
+        """
+        return self.filter(
+            status=self.model.INCOMPLETE, last_modification__lt=before
+        )
+
+
+def format_non_empty(formatter, submission, value):
+    if value is None or value == "":
+        return "-"
+    return formatter(submission, value)
+
+
+def split_choices(field, value):
+    """
+    Splits a formatted list of choices (see ``format_list``) back into
+    choices, which may themselves contain commas.
+    """
+    choices = {str(choice) for choice, label in field.choices}
+    values = []
+    parts = []
+    for part in value.split(", "):
+        parts.append(part)
+        if ", ".join(parts) in choices:
+            values.append(", ".join(parts))
+            parts = []
+    if parts:
+        values.append(", ".join(parts))
+    return values
+
+
+def get_field_values(field, value, raw=False):
+    """
+    Returns the non-empty values of ``field`` as strings, one per choice for
+    fields with several choices. ``value`` is the raw cleaned data of the
+    field if ``raw`` is set, or else its displayed value (see
+    ``format_value``), whose choices are split with ``split_choices()``.
+    """
+    if (
+        not raw
+        and isinstance(value, str)
+        and isinstance(field, forms.MultipleChoiceField)
+    ):
+        value = split_choices(field, value)
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    values = []
+    for item in value:
+        # "-" is displayed for empty values, see ``format_non_empty``.
+        if item is None or item == "" or (not raw and item == "-"):
+            continue
+        if isinstance(item, bool):
+            item = format_boolean(None, item)
+        values.append(str(item))
+    return values
+
+
+def format_with_format_value(field, submission, value):
+    return submission.format_value(field, value)
+
+
+def format_text(submission, value):
+    return str(value)
+
+
+def format_boolean(submission, value):
+    return "Yes" if value else "No"
+
+
+def format_list(submission, value):
+    return ", ".join(str(item) for item in value)
+
+
+def format_date(submission, value):
+    return value
+
+
+class SubmissionRevisionWriter:
+    """
+    Records revisions of session submissions as they are saved or deleted.
+
+    The default writer creates the revision immediately, as part of the
+    request which saved the submission.
+    """
+
+    def __init__(self, submission_class):
+        self.submission_class = submission_class
+
+    def write(self, submission, revision_type):
+        SubmissionRevision = self.submission_class.get_revision_class()
+        return SubmissionRevision.create_from_submission(
+            submission, revision_type
+        )
+
+
+class QueuedSubmissionRevisionWriter(SubmissionRevisionWriter):
+    """
+    Queues a snapshot of the submission in an outbox table instead of
+    creating the revision. Queued snapshots are turned into revisions in
+    batches by the ``drain_revision_outbox`` management command.
+
+    Requires ``get_revision_outbox_class()`` on the submission class.
+    """
+
+    def write(self, submission, revision_type):
+        Outbox = self.submission_class.get_revision_outbox_class()
+        if Outbox is None:
+            raise ImproperlyConfigured(
+                f"{self.submission_class.__name__} must implement "
+                f"get_revision_outbox_class() to use {type(self).__name__}."
+            )
+        return Outbox.enqueue(submission, revision_type)
+
+
 class AbstractSessionFormSubmission(AbstractFormSubmission):
     class Meta:
         verbose_name = _("form submission")
         verbose_name_plural = _("form submissions")
         unique_together = (("page", "session_key"), ("page", "user"))
+        indexes: typing.ClassVar[list] = [
+            # Used to clean up old drafts, by status and age.
+            models.Index(fields=["status", "last_modification"]),
+        ]
         abstract = True
 
     session_key = models.CharField(
@@ -343,6 +621,26 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
         choices=STATUSES,
         default=INCOMPLETE,
     )
+    # Verification of images uploaded to ``DeferredImageField``.
+    IMAGES_PENDING = "pending"
+    IMAGES_VERIFIED = "verified"
+    IMAGES_REJECTED = "rejected"
+    IMAGE_STATUSES = (
+        (IMAGES_PENDING, _("Pending")),
+        (IMAGES_VERIFIED, _("Verified")),
+        (IMAGES_REJECTED, _("Rejected")),
+    )
+    image_status = models.CharField(
+        _("image status"),
+        max_length=10,
+        choices=IMAGE_STATUSES,
+        blank=True,
+        default="",
+    )
+
+    objects = SessionFormSubmissionQuerySet.as_manager()
+
+    revision_writer_class = SubmissionRevisionWriter
 
     @staticmethod
     def get_revision_class():
@@ -352,6 +650,18 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
         """
         return AbstractSubmissionRevision
 
+    @staticmethod
+    def get_revision_outbox_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractSubmissionRevisionOutbox`` in order to use the
+        ``QueuedSubmissionRevisionWriter``.
+        """
+
+    @classmethod
+    def get_revision_writer(cls):
+        return cls.revision_writer_class(cls)
+
     @property
     def is_complete(self):
         return self.status != self.INCOMPLETE
@@ -378,28 +688,149 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
         return self.form_page.get_storage()
 
     def get_fields(self, by_step=False):
-        return self.form_page.get_form_fields(by_step=by_step)
+        schema = self.form_page.get_form_schema()
+        if by_step:
+            return [
+                OrderedDict(
+                    (name, field.field) for name, field in step.fields.items()
+                )
+                for step in schema.steps
+            ]
+        return OrderedDict(
+            (name, field.field) for name, field in schema.fields.items()
+        )
 
     def get_files_by_field(self) -> typing.Dict[str, str]:
         """
         Returns a dictionary of field name : file path.
         """
-        data = self.get_data(raw=True)
+        data = self.get_data(raw=True, add_metadata=False)
         files = {}
-        for name, field in self.get_fields().items():
-            if isinstance(field, forms.FileField):
-                path = data.get(name)
-                if path:
-                    files[name] = path
+        for name in self.form_page.get_form_schema().file_fields:
+            path = data.get(name)
+            if path:
+                files[name] = path
         return files
 
+    def get_deferred_images(self):
+        """
+        Returns the images uploaded to ``DeferredImageField`` fields, as
+        ``(path, max_dimension)`` pairs.
+        """
+        fields = self.form_page.get_form_schema().fields
+        return [
+            (path, fields[name].field.max_dimension)
+            for name, path in self.get_files_by_field().items()
+            if isinstance(fields[name].field, DeferredImageField)
+        ]
+
+    def schedule_image_processing(
+        self, images, complete=False, delete_session=True
+    ):
+        """
+        Processes ``images`` in a background thread once the current
+        transaction is committed. If ``complete`` is set, the final
+        submission is then created, see
+        ``StreamFormMixin.create_final_submission()``. Override this to use a
+        task queue instead.
+        """
+        Submission = type(self)
+        pk = self.pk
+
+        def process():
+            try:
+                submission = Submission.objects.filter(pk=pk).first()
+                if submission is None:
+                    return
+                submission.process_images(images)
+                if complete:
+                    submission.form_page.finalize_session_submission(
+                        submission, delete_session=delete_session
+                    )
+            finally:
+                close_old_connections()
+
+        transaction.on_commit(lambda: get_image_executor().submit(process))
+
+    def process_images(self, images):
+        """
+        Verifies and cleans up ``images``, see ``process_image()``. Cleaned
+        up images are stored as new files which replace the original ones in
+        the submission, and rejected images are removed from it. Replaced
+        files are released once the transaction is committed, and
+        ``image_status`` is updated.
+
+        Images which are no longer in the submission when it is updated, for
+        example because they were processed concurrently, are left alone.
+        """
+        page = self.form_page
+        storage = page.get_storage()
+        replacements = {}
+        for path, max_dimension in images:
+            try:
+                result = process_image(storage, path, max_dimension)
+            except FileNotFoundError:
+                continue  # Replaced or moved since.
+            if result is False:
+                replacements[path] = ""
+            elif result is not True:
+                replacements[path] = page.store_upload(result)
+            else:
+                replacements[path] = path
+        with transaction.atomic():
+            Submission = type(self)
+            current = (
+                Submission.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("form_data", flat=True)
+                .first()
+            )
+            steps_data = json.loads(current) if current is not None else []
+            replaced = set()
+            for step_data in steps_data:
+                for name, value in step_data.items():
+                    if isinstance(value, str) and value in replacements:
+                        step_data[name] = replacements[value]
+                        replaced.add(value)
+            released = []
+            for path, new_path in replacements.items():
+                if new_path == path:
+                    continue
+                if path in replaced:
+                    released.append(path)  # Replaced or rejected.
+                elif new_path:
+                    released.append(new_path)  # Not used.
+            if current is not None:
+                self.form_data = json.dumps(
+                    steps_data, cls=StreamFormJSONEncoder
+                )
+                self.image_status = (
+                    self.IMAGES_REJECTED
+                    if any(not replacements[path] for path in replaced)
+                    else self.IMAGES_VERIFIED
+                )
+                # Not a change made by the user: no revision is created.
+                Submission.objects.filter(pk=self.pk).update(
+                    form_data=self.form_data, image_status=self.image_status
+                )
+
+            def release():
+                for path in released:
+                    page.release_upload(path)
+
+            transaction.on_commit(release)
+
     def get_all_files(self):
         for path in self.get_files_by_field().values():
             yield path
 
     def delete_file(self, field_name):
-        for path in self.get_files_by_field().get(field_name, ()):
-            self.get_storage().delete(path)
+        if self.is_complete:
+            # Files of completed drafts are referenced by the final submission.
+            return
+        path = self.get_files_by_field().get(field_name)
+        if path:
+            self.form_page.release_upload(path)
 
     def render_email(self, value):
         return value
@@ -442,6 +873,69 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
             return value
         return str(value)
 
+    @classmethod
+    def get_value_formatter(cls, field):
+        """
+        Returns a function called with ``(submission, value)`` to format
+        non-empty values of the given form field.
+        """
+        if isinstance(field, forms.ImageField):
+            return cls.render_image
+        if isinstance(field, forms.FileField):
+            return cls.render_file
+        if isinstance(field, forms.EmailField):
+            return cls.render_email
+        if isinstance(field, forms.URLField):
+            return cls.render_link
+        if isinstance(field, forms.BooleanField):
+            return format_boolean
+        if isinstance(field, forms.MultipleChoiceField):
+            return format_list
+        if isinstance(
+            field,
+            (
+                forms.DateField,
+                forms.TimeField,
+                forms.DateTimeField,
+                forms.SplitDateTimeField,
+            ),
+        ):
+            return format_date
+        return format_text
+
+    @classmethod
+    def build_value_formatters(cls, schema, page):
+        if (
+            cls.format_value is not AbstractSessionFormSubmission.format_value
+            or type(page).format_value is not StreamFormMixin.format_value
+        ):
+            # ``format_value()`` is customized; call it for every value.
+            return {
+                name: partial(format_with_format_value, field.field)
+                for name, field in schema.fields.items()
+            }
+        return {
+            name: partial(
+                format_non_empty, cls.get_value_formatter(field.field)
+            )
+            for name, field in schema.fields.items()
+        }
+
+    def get_value_formatters(self) -> dict[str, typing.Callable]:
+        """
+        Returns a dictionary of {field name: formatter}. Each formatter is
+        called with ``(submission, value)``. Formatters are resolved once per
+        submission class and page revision, and cached on the ``FormSchema``.
+        """
+        cls = type(self)
+        page = self.form_page
+        schema = page.get_form_schema()
+        formatters = schema.formatters.get(cls)
+        if formatters is None:
+            formatters = cls.build_value_formatters(schema, page)
+            schema.formatters[cls] = formatters
+        return formatters
+
     def format_db_field(self, field_name, raw=False):
         method = getattr(self, "get_%s_display" % field_name, None)
         if method is not None:
@@ -460,14 +954,16 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
         steps_data = json.loads(self.form_data)
         if raw:
             return steps_data
+        schema = self.form_page.get_form_schema()
+        formatters = self.get_value_formatters()
         fields_and_data_iterator = zip_longest(
-            self.get_fields(by_step=True), steps_data, fillvalue={}
+            [step.fields for step in schema.steps], steps_data, fillvalue={}
         )
         list_od = []
         for step_fields, step_data in fields_and_data_iterator:
             od = OrderedDict()
-            for name, field in step_fields.items():
-                od[name] = self.format_value(field, step_data.get(name))
+            for name in step_fields:
+                od[name] = formatters[name](self, step_data.get(name))
             list_od.append(od)
 
         return list_od
@@ -502,24 +998,18 @@ class AbstractSessionFormSubmission(AbstractFormSubmission):
             yield (step, fieldlist)
 
 
-@receiver(post_delete, sender=AbstractSessionFormSubmission)
+@receiver(post_delete)
 def delete_files(sender, **kwargs):
+    if not issubclass(sender, AbstractSessionFormSubmission):
+        return
     instance = kwargs["instance"]
     instance.reset_step()
-    storage = instance.get_storage()
+    if instance.is_complete:
+        # Files of completed drafts are referenced by the final submission.
+        return
+    page = instance.form_page
     for path in instance.get_all_files():
-        storage.delete(path)
-
-        # Automatically deletes ancestor folders if empty.
-        directory = Path(path)
-        while directory.parent != Path(directory.root):
-            directory = directory.parent
-            try:
-                subdirectories, files = storage.listdir(directory)
-            except FileNotFoundError:
-                continue
-            if not subdirectories and not files:
-                Path(storage.path(directory)).rmdir()
+        page.release_upload(path)
 
 
 class SubmissionRevisionQuerySet(models.QuerySet):
@@ -540,6 +1030,11 @@ class AbstractSubmissionRevision(models.Model):
     class Meta:
         ordering = ("-created_at",)
         abstract = True
+        indexes: typing.ClassVar[list] = [
+            models.Index(
+                fields=["submission_ct", "submission_id", "created_at"]
+            ),
+        ]
 
     objects = SubmissionRevisionQuerySet.as_manager()
 
@@ -556,19 +1051,37 @@ class AbstractSubmissionRevision(models.Model):
         choices=TYPES,
     )
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
     )
     submission_ct = models.ForeignKey(
         "contenttypes.ContentType",
         on_delete=models.CASCADE,
     )
-    submission_id = models.TextField()
+    submission_id = models.CharField(
+        max_length=255,
+    )
     submission = GenericForeignKey(
         "submission_ct",
         "submission_id",
     )
     data = models.TextField()
     summary = models.TextField()
+    # 0 if ``data`` is a full snapshot, otherwise ``data`` only contains the
+    # changes since the previous revision, and this is the number of
+    # revisions since the last full snapshot.
+    delta_depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    # A full snapshot is stored every ``keyframe_interval`` revisions, other
+    # revisions only store the fields which changed. Set to 1 to always
+    # store full snapshots.
+    keyframe_interval = 10
+
+    # The full data, cached by ``get_data()``.
+    _decoded_data: dict
 
     @staticmethod
     def get_filters_for(submission):
@@ -622,20 +1135,68 @@ class AbstractSubmissionRevision(models.Model):
                 )
         return "\n".join(diff)
 
-    @classmethod
-    def create_from_submission(cls, submission, revision_type):
-        page = submission.form_page
-        try:
-            previous = cls.objects.for_submission(submission).latest(
-                "created_at"
-            )
-        except cls.DoesNotExist:
-            previous_data = {}
-        else:
-            previous_data = previous.get_data()
-        filters = cls.get_filters_for(submission)
+    @staticmethod
+    def get_submission_data(submission):
+        """
+        Returns the raw data of the submission, as stored in revisions.
+        """
         data = submission.get_data(raw=True, add_metadata=False)
         data["status"] = submission.status
+        return data
+
+    @staticmethod
+    def get_delta(data1, data2):
+        """
+        Returns the changes from ``data1`` to ``data2``.
+        """
+        return {
+            "set": {
+                k: v
+                for k, v in data2.items()
+                if k not in data1 or data1[k] != v
+            },
+            "unset": [k for k in data1 if k not in data2],
+        }
+
+    @staticmethod
+    def apply_delta(data, delta):
+        data = dict(data, **delta["set"])
+        for k in delta["unset"]:
+            data.pop(k, None)
+        return data
+
+    @classmethod
+    def encode_data(cls, previous_data, data, previous_depth=None):
+        """
+        Returns the ``(data, delta_depth)`` to store for a revision of
+        ``data``. ``previous_depth`` is the ``delta_depth`` of the previous
+        revision, or ``None`` if there is none.
+        """
+        if previous_depth is None or previous_depth + 1 >= max(
+            cls.keyframe_interval, 1
+        ):
+            return json.dumps(data, cls=StreamFormJSONEncoder), 0
+        delta = cls.get_delta(previous_data, data)
+        return (
+            json.dumps(delta, cls=StreamFormJSONEncoder),
+            previous_depth + 1,
+        )
+
+    @classmethod
+    def build_revision(
+        cls,
+        page,
+        filters,
+        previous_data,
+        data,
+        revision_type,
+        previous_depth=None,
+        **kwargs,
+    ):
+        """
+        Returns an unsaved revision of ``data``, or ``None`` if nothing
+        changed since ``previous_data``.
+        """
         if revision_type == cls.CREATED:
             summary = _("Submission created.")
         elif revision_type == cls.DELETED:
@@ -643,44 +1204,1057 @@ class AbstractSubmissionRevision(models.Model):
         else:
             summary = cls.diff_summary(page, previous_data, data)
         if not summary:  # Nothing changed.
-            return
-        filters.update(
+            return None
+        encoded, delta_depth = cls.encode_data(
+            previous_data, data, previous_depth
+        )
+        revision = cls(
             type=revision_type,
-            data=json.dumps(data, cls=StreamFormJSONEncoder),
+            data=encoded,
+            delta_depth=delta_depth,
             summary=summary,
+            **filters,
+            **kwargs,
+        )
+        # Avoids rebuilding the data from the previous revisions.
+        revision._decoded_data = data
+        return revision
+
+    @classmethod
+    def get_latest_data(cls, filters):
+        """
+        Returns the ``(data, delta_depth)`` of the latest revision matching
+        ``filters``, which the next revision is encoded against.
+        ``delta_depth`` is ``None`` if there is no revision, or if its data
+        cannot be rebuilt, so that the next revision is a full snapshot.
+        """
+        try:
+            previous = cls.objects.filter(**filters).latest("created_at", "pk")
+        except cls.DoesNotExist:
+            return {}, None
+        try:
+            return previous.get_data(), previous.delta_depth
+        except (KeyError, TypeError, ValueError):
+            logger.exception(
+                "Cannot rebuild the data of submission revision %s, the next "
+                "revision is stored as a full snapshot.",
+                previous.pk,
+            )
+            return {}, None
+
+    @classmethod
+    def create_from_submission(cls, submission, revision_type):
+        page = submission.form_page
+        filters = cls.get_filters_for(submission)
+        previous_data, previous_depth = cls.get_latest_data(filters)
+        revision = cls.build_revision(
+            page,
+            filters,
+            previous_data,
+            cls.get_submission_data(submission),
+            revision_type,
+            previous_depth=previous_depth,
+        )
+        if revision is not None:
+            revision.save()
+        return revision
+
+    def get_previous_revisions(self):
+        """
+        Returns the revisions of the same submission before this one, most
+        recent first.
+        """
+        return (
+            type(self)
+            .objects.filter(
+                submission_ct_id=self.submission_ct_id,
+                submission_id=self.submission_id,
+            )
+            .filter(
+                models.Q(created_at__lt=self.created_at)
+                | models.Q(created_at=self.created_at, pk__lt=self.pk)
+            )
+            .order_by("-created_at", "-pk")
         )
-        return cls.objects.create(**filters)
 
     def get_data(self):
-        return json.loads(self.data)
+        """
+        Returns the full data of the submission at this revision. Deltas are
+        applied to the last full snapshot, fetched in a single query.
+        """
+        if getattr(self, "_decoded_data", None) is not None:
+            return self._decoded_data
+        if not self.delta_depth:
+            data = json.loads(self.data)
+        else:
+            chain = list(
+                self.get_previous_revisions().only(
+                    "data", "delta_depth", "created_at"
+                )[: self.delta_depth]
+            )
+            chain.reverse()
+            chain.append(self)
+            if chain[0].delta_depth:
+                raise ValueError(
+                    f"Missing full snapshot for revision {self.pk}."
+                )
+            data = json.loads(chain[0].data)
+            for revision in chain[1:]:
+                data = self.apply_delta(data, json.loads(revision.data))
+        self._decoded_data = data
+        return data
 
+    @classmethod
+    def compact(cls, submission_ct_id, submission_id, keep=None):
+        """
+        Re-encodes the revisions of a submission with the current
+        ``keyframe_interval``, keeping only the ``keep`` most recent ones.
+        Returns the number of deleted revisions.
+        """
+        with transaction.atomic():
+            revisions = list(
+                cls.objects.select_for_update()
+                .filter(
+                    submission_ct_id=submission_ct_id,
+                    submission_id=submission_id,
+                )
+                .order_by("created_at", "pk")
+            )
+            data: dict = {}
+            for revision in revisions:
+                if revision.delta_depth:
+                    data = cls.apply_delta(data, json.loads(revision.data))
+                else:
+                    data = json.loads(revision.data)
+                revision._decoded_data = data
+
+            deleted = []
+            if keep is not None and len(revisions) > keep:
+                split = len(revisions) - keep
+                deleted = revisions[:split]
+                revisions = revisions[split:]
+
+            changed = []
+            previous_data: dict = {}
+            previous_depth = None
+            for revision in revisions:
+                encoded, delta_depth = cls.encode_data(
+                    previous_data, revision._decoded_data, previous_depth
+                )
+                if (
+                    revision.delta_depth != delta_depth
+                    or revision.data != encoded
+                ):
+                    revision.data = encoded
+                    revision.delta_depth = delta_depth
+                    changed.append(revision)
+                previous_data = revision._decoded_data
+                previous_depth = delta_depth
 
-@receiver(post_save)
-def create_submission_changed_revision(sender, **kwargs):
-    if not issubclass(sender, AbstractSessionFormSubmission):
-        return
-    # ``sender`` is the concrete class of AbstractSessionFormSubmission.
-    SubmissionRevision = sender.get_revision_class()
-    submission = kwargs["instance"]
-    created = kwargs["created"]
-    SubmissionRevision.create_from_submission(
-        submission,
-        (SubmissionRevision.CREATED if created else SubmissionRevision.CHANGED),
-    )
+            if deleted:
+                cls.objects.filter(
+                    pk__in=[revision.pk for revision in deleted]
+                ).delete()
+            cls.objects.bulk_update(changed, ["data", "delta_depth"])
+        return len(deleted)
 
 
-@receiver(post_delete)
-def create_submission_deleted_revision(sender, **kwargs):
-    if not issubclass(sender, AbstractSessionFormSubmission):
+class AbstractSubmissionRevisionOutbox(models.Model):
+    """
+    Snapshots of session submissions waiting to be turned into revisions,
+    see ``QueuedSubmissionRevisionWriter``.
+    """
+
+    class Meta:
+        ordering = ("pk",)
+        abstract = True
+        indexes: typing.ClassVar[list] = [
+            models.Index(fields=["submission_ct", "submission_id"]),
+        ]
+
+    type = models.CharField(
+        max_length=7,
+        choices=AbstractSubmissionRevision.TYPES,
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+    )
+    page = models.ForeignKey(
+        "wagtailcore.Page",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    submission_ct = models.ForeignKey(
+        "contenttypes.ContentType",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    submission_id = models.CharField(
+        max_length=255,
+    )
+    data = models.TextField()
+
+    @classmethod
+    def enqueue(cls, submission, revision_type):
+        SubmissionRevision = submission.get_revision_class()
+        data = SubmissionRevision.get_submission_data(submission)
+        return cls.objects.create(
+            type=revision_type,
+            page_id=submission.page_id,
+            data=json.dumps(data, cls=StreamFormJSONEncoder),
+            **SubmissionRevision.get_filters_for(submission),
+        )
+
+    @classmethod
+    def drain(cls, batch_size=500):
+        """
+        Turns up to ``batch_size`` of the oldest queued snapshots into
+        revisions, and removes them from the queue. Revisions are inserted
+        in bulk. Returns the number of snapshots processed.
+
+        Each revision is built against the previous one, so the snapshots of
+        a submission must be processed in order by a single worker. The
+        oldest snapshot of each submission is locked, and stands for all of
+        them: submissions whose oldest snapshot is locked by another worker
+        are skipped, including their newer snapshots.
+        """
+        with transaction.atomic():
+            rows = cls.objects.order_by("pk").values_list(
+                "pk", "submission_ct_id", "submission_id"
+            )[:batch_size]
+            pks_by_submission: OrderedDict[tuple, list] = OrderedDict()
+            for pk, ct_id, submission_id in rows:
+                pks_by_submission.setdefault((ct_id, submission_id), []).append(
+                    pk
+                )
+            if not pks_by_submission:
+                return 0
+            # Deleted meanwhile if already processed by another worker.
+            locked = set(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(pk__in=[pks[0] for pks in pks_by_submission.values()])
+                .values_list("pk", flat=True)
+            )
+            entries = list(
+                cls.objects.filter(
+                    pk__in=[
+                        pk
+                        for pks in pks_by_submission.values()
+                        if pks[0] in locked
+                        for pk in pks
+                    ]
+                ).order_by("pk")
+            )
+            if not entries:
+                return 0
+            by_submission: OrderedDict[tuple, list] = OrderedDict()
+            for entry in entries:
+                key = (entry.submission_ct_id, entry.submission_id)
+                by_submission.setdefault(key, []).append(entry)
+
+            pages: dict[int, Page] = {}
+            revisions: OrderedDict[typing.Any, list] = OrderedDict()
+            for (ct_id, submission_id), group in by_submission.items():
+                Submission = ContentType.objects.get_for_id(ct_id).model_class()
+                SubmissionRevision = Submission.get_revision_class()
+                filters = {
+                    "submission_ct_id": ct_id,
+                    "submission_id": submission_id,
+                }
+                previous_data, previous_depth = (
+                    SubmissionRevision.get_latest_data(filters)
+                )
+                for entry in group:
+                    page = pages.get(entry.page_id)
+                    if page is None:
+                        page = Page.objects.get(pk=entry.page_id).specific
+                        pages[entry.page_id] = page
+                    data = json.loads(entry.data)
+                    revision = SubmissionRevision.build_revision(
+                        page,
+                        filters,
+                        previous_data,
+                        data,
+                        entry.type,
+                        previous_depth=previous_depth,
+                        created_at=entry.created_at,
+                    )
+                    if revision is not None:
+                        revisions.setdefault(SubmissionRevision, []).append(
+                            revision
+                        )
+                        previous_data = data
+                        previous_depth = revision.delta_depth
+
+            for SubmissionRevision, objs in revisions.items():
+                SubmissionRevision.objects.bulk_create(objs)
+            cls.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+        return len(entries)
+
+
+class AbstractUploadBlob(models.Model):
+    """
+    A file uploaded to stream forms, stored once however many times the same
+    content is uploaded. ``references`` counts the drafts and final
+    submissions using it.
+    """
+
+    class Meta:
+        abstract = True
+
+    content_hash = models.CharField(
+        max_length=64,
+        unique=True,
+    )
+    path = models.CharField(
+        max_length=255,
+        db_index=True,
+    )
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(
+        default=0,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    @classmethod
+    def acquire(cls, storage, file, path, content_hash=None):
+        """
+        Adds a reference to the blob of ``file``, storing the file at
+        ``path`` if its content is new. Returns the path of the blob.
+        ``content_hash`` is computed if not given.
+        """
+        if content_hash is None:
+            content_hash = get_content_hash(file)
+        blobs = cls.objects.filter(content_hash=content_hash)
+        if blobs.update(references=models.F("references") + 1):
+            if isinstance(file, StoredUploadedFile):
+                file.delete()  # Duplicate content.
+            return blobs.values_list("path", flat=True).get()
+
+        if isinstance(file, StoredUploadedFile):
+            file.close()
+            path = move_upload(storage, file.path, path)
+        else:
+            path = storage.save(path, file)
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    content_hash=content_hash,
+                    path=path,
+                    size=file.size,
+                    references=1,
+                )
+        except IntegrityError:
+            # The same content was stored concurrently by another upload.
+            blobs.update(references=models.F("references") + 1)
+            existing_path = blobs.values_list("path", flat=True).get()
+            if existing_path != path:
+                delete_upload(storage, path)
+            return existing_path
+        return path
+
+    @classmethod
+    def release(cls, storage, path):
+        """
+        Removes a reference to the blob at ``path``. Once the transaction is
+        committed, the blob and its file are deleted if it is no longer used,
+        see ``delete_unused()``. Returns ``False`` if ``path`` is not a blob.
+        """
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(path=path).first()
+            if blob is None:
+                return False
+            blob.references = max(blob.references - 1, 0)
+            blob.save(update_fields=["references"])
+            if not blob.references:
+                transaction.on_commit(partial(cls.delete_unused, storage, path))
+        return True
+
+    @classmethod
+    def delete_unused(cls, storage, path):
+        """
+        Deletes the blob at ``path`` and its file, unless it was acquired
+        again since it was released. The blob stays locked until its file is
+        deleted, so that the same content uploaded meanwhile is stored anew.
+        """
+        with transaction.atomic():
+            blob = (
+                cls.objects.select_for_update()
+                .filter(path=path, references=0)
+                .first()
+            )
+            if blob is None:
+                return
+            blob.delete()
+            delete_upload(storage, path)
+
+
+class AbstractChunkedUpload(models.Model):
+    """
+    A file uploaded to a file field of a stream form page in several
+    requests, which can be resumed after a failure. Uploads are keyed by the
+    owner of the draft (user or session) and field slug. Once all chunks are
+    received, the file is assembled and its ID is submitted with the form in
+    place of the file, see ``Steps.get_files()``.
+    """
+
+    class Meta:
+        unique_together = (
+            ("page", "session_key", "field_name"),
+            ("page", "user", "field_name"),
+        )
+        abstract = True
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+    page = models.ForeignKey(
+        Page,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    session_key = models.CharField(
+        max_length=40,
+        null=True,
+        default=None,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    field_name = models.CharField(
+        max_length=255,
+    )
+    file_name = models.CharField(
+        max_length=255,
+    )
+    content_type = models.CharField(
+        max_length=255,
+        blank=True,
+    )
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(
+        default=0,
+    )
+    # Paths of the chunks received so far, in order.
+    parts = models.JSONField(
+        default=list,
+        blank=True,
+    )
+    # Path of the assembled file, once complete.
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+    last_modification = models.DateTimeField(
+        auto_now=True,
+    )
+
+    @staticmethod
+    def get_owner_filters(request, create=False):
+        """
+        Returns the lookup of the uploads of ``request``, like the lookup of
+        its session submission. Returns ``None`` if the anonymous user has no
+        session, unless ``create`` is set.
+        """
+        if request.user.is_authenticated:
+            return {"user": request.user}
+        if not request.session.session_key:
+            if not create:
+                return None
+            request.session.create()
+        return {"session_key": request.session.session_key}
+
+    @property
+    def is_complete(self):
+        return bool(self.path)
+
+    def get_chunk_path(self, page):
+        return (
+            f"{page.upload_directory}/chunks/{self.pk.hex}/{self.offset:015d}"
+        )
+
+    def write_chunk(self, page, stream, length):
+        """
+        Stores ``length`` bytes read from ``stream`` at the current offset,
+        and assembles the file once all chunks are received. Returns
+        ``False`` if fewer bytes were received, in which case the chunk is
+        discarded and should be sent again.
+        """
+        storage = page.get_storage()
+        path = storage.save(self.get_chunk_path(page), File(stream))
+        if storage.size(path) != length:
+            delete_upload(storage, path)
+            return False
+        self.parts.append(path)
+        self.offset += length
+        if self.offset >= self.size:
+            self.assemble(page)
+        self.save()
+        return True
+
+    def assemble(self, page):
+        """
+        Concatenates the chunks into the uploaded file, hashing it on the
+        way, then deletes the chunks.
+        """
+        storage = page.get_storage()
+        hasher = hashlib.sha256()
+        reader = ConcatenatedReader(storage, self.parts, hasher)
+        file = File(io.BufferedReader(reader), name=self.file_name)
+        file.size = self.size
+        try:
+            self.path = storage.save(page.get_upload_path(self.file_name), file)
+        finally:
+            reader.close()
+        self.content_hash = hasher.hexdigest()
+        for path in self.parts:
+            delete_upload(storage, path)
+        self.parts = []
+
+    def get_uploaded_file(self, storage):
+        file = StoredUploadedFile(
+            storage,
+            self.path,
+            self.file_name,
+            self.content_type,
+            self.size,
+            None,
+            content_hash=self.content_hash,
+        )
+        # Deleted once the file is saved, see ``Steps.save_files()``.
+        file.chunked_upload = self
+        return file
+
+    def discard(self, page):
+        """
+        Deletes the upload, with its chunks or assembled file.
+        """
+        storage = page.get_storage()
+        paths = self.parts + ([self.path] if self.path else [])
+        self.delete()
+
+        def delete_files():
+            for path in paths:
+                delete_upload(storage, path)
+
+        transaction.on_commit(delete_files)
+
+
+class AbstractSubmissionCounter(models.Model):
+    """
+    Submission counts of a stream form page, kept up to date as submissions
+    are created and deleted, so that they are read with a single query.
+    """
+
+    class Meta:
+        abstract = True
+
+    page = models.OneToOneField(
+        Page,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    # Session submissions, complete or not.
+    draft_count = models.PositiveIntegerField(
+        default=0,
+    )
+    # Final submissions.
+    submission_count = models.PositiveIntegerField(
+        default=0,
+    )
+    last_submit_time = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    @classmethod
+    def get_for_page(cls, page):
+        """
+        Returns the counter of ``page``, counting its submissions if it does
+        not exist yet.
+        """
+        try:
+            return cls.objects.get(page_id=page.pk)
+        except cls.DoesNotExist:
+            return cls.rebuild(page)
+
+    @classmethod
+    def count(cls, page):
+        """
+        Counts the submissions of ``page``, returning the values of the
+        fields of its counter.
+        """
+        Submission = page.get_submission_class()
+        SessionSubmission = page.get_session_submission_class()
+        stats = Submission.objects.filter(page_id=page.pk).aggregate(
+            count=models.Count("pk"),
+            last=models.Max("submit_time"),
+        )
+        return {
+            "draft_count": SessionSubmission.objects.filter(
+                page_id=page.pk
+            ).count(),
+            "submission_count": stats["count"],
+            "last_submit_time": stats["last"],
+        }
+
+    @classmethod
+    def rebuild(cls, page):
+        """
+        Counts the submissions of ``page`` and saves its counter.
+        """
+        counter, _created = cls.objects.update_or_create(
+            page_id=page.pk, defaults=cls.count(page)
+        )
+        return counter
+
+    @classmethod
+    def add(cls, page, drafts=0, submissions=0, submit_time=None):
+        """
+        Adds to the counts of ``page``, atomically. Negative values are
+        subtracted. The submissions are counted if it has no counter yet.
+        """
+        updates = {}
+        if drafts:
+            updates["draft_count"] = Greatest(
+                models.F("draft_count") + drafts, 0
+            )
+        if submissions:
+            updates["submission_count"] = Greatest(
+                models.F("submission_count") + submissions, 0
+            )
+        if submit_time is not None:
+            updates["last_submit_time"] = submit_time
+        if not updates:
+            return
+        if cls.objects.filter(page_id=page.pk).update(**updates):
+            return
+        try:
+            # The counts already include the changes of this transaction.
+            with transaction.atomic():
+                cls.objects.create(page_id=page.pk, **cls.count(page))
+        except IntegrityError:
+            # Created concurrently, without the changes of this transaction.
+            cls.objects.filter(page_id=page.pk).update(**updates)
+
+
+class AbstractSubmissionValue(models.Model):
+    """
+    A value of a field of a final submission, indexed so that submissions can
+    be filtered by answer without decoding their ``form_data``. Fields with
+    several values (e.g. checkboxes) have one row per value.
+    """
+
+    class Meta:
+        indexes: typing.ClassVar[list] = [
+            models.Index(fields=["page", "field_name", "value"]),
+        ]
+        abstract = True
+
+    page = models.ForeignKey(
+        Page,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    submission = models.ForeignKey(
+        FormSubmission,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    field_name = models.CharField(
+        max_length=255,
+    )
+    value = models.CharField(
+        max_length=255,
+    )
+
+    @classmethod
+    def get_values(cls, schema, data, raw=False):
+        """
+        Yields the ``(field_name, value)`` pairs to index from the ``data``
+        of a final submission, either raw or as displayed, see
+        ``get_field_values()``. Fields with several choices have one value
+        per choice. File fields, empty values and values too long to be
+        indexed are skipped.
+        """
+        for slug, field_schema in schema.fields.items():
+            if field_schema.is_file:
+                continue
+            for value in get_field_values(
+                field_schema.field, data.get(slug), raw=raw
+            ):
+                if len(value) <= 255:
+                    yield slug, value
+
+    @classmethod
+    def build_values(cls, page, submissions):
+        schema = page.get_form_schema()
+        for submission in submissions:
+            data = submission.get_data()
+            for field_name, value in cls.get_values(schema, data):
+                yield cls(
+                    page_id=page.pk,
+                    submission_id=submission.pk,
+                    field_name=field_name,
+                    value=value,
+                )
+
+    @classmethod
+    def index_submissions(cls, page, submissions):
+        """
+        Indexes the values of ``submissions`` of ``page``, from the data
+        they display. Choices which contain ", " may be split ambiguously,
+        see ``split_choices()``.
+        """
+        cls.objects.bulk_create(cls.build_values(page, submissions))
+
+    @classmethod
+    def index_submission(cls, page, submission, raw_data):
+        """
+        Indexes the values of a new final ``submission`` of ``page``, from
+        the raw cleaned data of its session submission.
+        """
+        cls.objects.bulk_create(
+            cls(
+                page_id=page.pk,
+                submission_id=submission.pk,
+                field_name=field_name,
+                value=value,
+            )
+            for field_name, value in cls.get_values(
+                page.get_form_schema(), raw_data, raw=True
+            )
+        )
+
+    @classmethod
+    def filter_submissions(cls, page, queryset, field_name, value):
+        """
+        Filters ``queryset`` down to the submissions of ``page`` which have
+        ``value`` in field ``field_name``, with a subquery on the index.
+        """
+        return queryset.filter(
+            pk__in=cls.objects.filter(
+                page_id=page.pk, field_name=field_name, value=value
+            ).values("submission_id")
+        )
+
+
+class AbstractAnswerStatistic(models.Model):
+    """
+    The number of final submissions of a page which gave an answer to a
+    choice field (radio buttons, dropdown, checkbox or checkboxes), kept up
+    to date as submissions are created.
+    """
+
+    class Meta:
+        unique_together = (("page", "field_name", "value"),)
+        abstract = True
+
+    page = models.ForeignKey(
+        Page,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    field_name = models.CharField(
+        max_length=255,
+    )
+    value = models.CharField(
+        max_length=255,
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    @staticmethod
+    def get_answers(schema, data, raw=False):
+        """
+        Yields the ``(field_name, value)`` pairs of the answers to choice
+        fields in the ``data`` of a final submission, either raw or as
+        displayed, see ``get_field_values()``.
+        """
+        for slug, field_schema in schema.fields.items():
+            field = field_schema.field
+            if not isinstance(field, (forms.ChoiceField, forms.BooleanField)):
+                continue
+            for value in get_field_values(field, data.get(slug), raw=raw):
+                yield slug, value[:255]
+
+    @classmethod
+    def count_answers(cls, schema, submissions_data, raw=False):
+        """
+        Returns a ``Counter`` of ``(field_name, value)`` over the data of
+        many final submissions. Displayed data is recounted from choices
+        which may be split ambiguously, see ``split_choices()``.
+        """
+        counter: Counter[tuple] = Counter()
+        for data in submissions_data:
+            counter.update(cls.get_answers(schema, data, raw=raw))
+        return counter
+
+    @classmethod
+    def add(cls, page, counter):
+        """
+        Adds ``counter``, as returned by ``count_answers()``, to the
+        statistics of ``page``, atomically.
+        """
+        for (field_name, value), count in counter.items():
+            statistics = cls.objects.filter(
+                page_id=page.pk, field_name=field_name, value=value
+            )
+            if statistics.update(count=models.F("count") + count):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        page_id=page.pk,
+                        field_name=field_name,
+                        value=value,
+                        count=count,
+                    )
+            except IntegrityError:
+                # Created concurrently.
+                statistics.update(count=models.F("count") + count)
+
+    @classmethod
+    def count_indexed_answers(cls, page, Value):
+        """
+        Returns a ``Counter`` of the answers of all final submissions of
+        ``page``, in a single query on its submission value index, which
+        holds their cleaned values.
+        """
+        field_names = [
+            slug
+            for slug, field_schema in page.get_form_schema().fields.items()
+            if isinstance(
+                field_schema.field, (forms.ChoiceField, forms.BooleanField)
+            )
+        ]
+        counts = (
+            Value.objects.filter(page_id=page.pk, field_name__in=field_names)
+            .values("field_name", "value")
+            .annotate(count=models.Count("pk"))
+            .values_list("field_name", "value", "count")
+        )
+        return Counter(
+            {(field_name, value): count for field_name, value, count in counts}
+        )
+
+    @classmethod
+    def count_stored_answers(cls, page, batch_size=2000):
+        """
+        Returns a ``Counter`` of the answers of all final submissions of
+        ``page``, decoding their displayed data in batches, and the number
+        of submissions counted.
+        """
+        schema = page.get_form_schema()
+        Submission = page.get_submission_class()
+        form_data = (
+            Submission.objects.filter(page_id=page.pk)
+            .values_list("form_data", flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+        counter: Counter[tuple] = Counter()
+        count = 0
+        batch = []
+        for data in form_data:
+            batch.append(json.loads(data) if isinstance(data, str) else data)
+            if len(batch) >= batch_size:
+                counter += cls.count_answers(schema, batch)
+                count += len(batch)
+                batch = []
+        counter += cls.count_answers(schema, batch)
+        count += len(batch)
+        return counter, count
+
+    @classmethod
+    def rebuild(cls, page, batch_size=2000):
+        """
+        Recounts the answers of all final submissions of ``page``, and
+        replaces its statistics. Returns the number of submissions counted.
+
+        Answers are counted from the submission value index of the page if
+        it has one, see ``get_submission_value_class()``, and from the data
+        displayed by the submissions otherwise.
+        """
+        Value = page.get_submission_value_class()
+        if Value is not None:
+            counter = cls.count_indexed_answers(page, Value)
+            count = (
+                page.get_submission_class()
+                .objects.filter(page_id=page.pk)
+                .count()
+            )
+        else:
+            counter, count = cls.count_stored_answers(page, batch_size)
+        with transaction.atomic():
+            cls.objects.filter(page_id=page.pk).delete()
+            cls.objects.bulk_create(
+                cls(
+                    page_id=page.pk,
+                    field_name=field_name,
+                    value=value,
+                    count=value_count,
+                )
+                for (field_name, value), value_count in counter.items()
+            )
+        return count
+
+    @classmethod
+    def get_summary(cls, page):
+        """
+        Returns the statistics of ``page`` in a single query, as a list of
+        ``(field schema, [(value, count, percentage)])`` in the order of the
+        form. Percentages are of all the answers to the field.
+        """
+        schema = page.get_form_schema()
+        counts: dict[str, list] = {}
+        for field_name, value, count in (
+            cls.objects.filter(page_id=page.pk)
+            .order_by("-count", "value")
+            .values_list("field_name", "value", "count")
+        ):
+            counts.setdefault(field_name, []).append((value, count))
+        summary = []
+        for slug, field_schema in schema.fields.items():
+            if slug not in counts:
+                continue
+            total = sum(count for value, count in counts[slug])
+            summary.append(
+                (
+                    field_schema,
+                    [
+                        (value, count, 100 * count / total)
+                        for value, count in counts[slug]
+                    ],
+                )
+            )
+        return summary
+
+
+@receiver(post_save)
+def create_submission_changed_revision(sender, **kwargs):
+    if not issubclass(sender, AbstractSessionFormSubmission):
         return
     # ``sender`` is the concrete class of AbstractSessionFormSubmission.
     SubmissionRevision = sender.get_revision_class()
     submission = kwargs["instance"]
-    SubmissionRevision.create_from_submission(
-        submission, SubmissionRevision.DELETED
+    created = kwargs["created"]
+    sender.get_revision_writer().write(
+        submission,
+        (SubmissionRevision.CREATED if created else SubmissionRevision.CHANGED),
     )
 
 
+@receiver(post_delete)
+def create_submission_deleted_revision(sender, **kwargs):
+    if not issubclass(sender, AbstractSessionFormSubmission):
+        return
+    # ``sender`` is the concrete class of AbstractSessionFormSubmission.
+    SubmissionRevision = sender.get_revision_class()
+    submission = kwargs["instance"]
+    sender.get_revision_writer().write(submission, SubmissionRevision.DELETED)
+
+
+def get_form_page_with(submission, method_name):
+    """
+    Returns the specific page of ``submission`` if the class method
+    ``method_name`` of its page class returns a model, e.g.
+    ``"get_submission_counter_class"``. Other pages are recognised from their
+    content type, and are not fetched.
+    """
+    if AbstractFormSubmission.page.is_cached(submission):
+        page = submission.page
+        if isinstance(page, StreamFormMixin):
+            # Already specific.
+            return page if getattr(page, method_name)() is not None else None
+        content_type_id = page.content_type_id
+    else:
+        content_type_id = (
+            Page.objects.filter(pk=submission.page_id)
+            .values_list("content_type_id", flat=True)
+            .first()
+        )
+        if content_type_id is None:
+            return None  # Deleted along with the page.
+    page_class = ContentType.objects.get_for_id(content_type_id).model_class()
+    if (
+        page_class is None
+        or not issubclass(page_class, StreamFormMixin)
+        or getattr(page_class, method_name)() is None
+    ):
+        return None
+    return page_class.objects.filter(pk=submission.page_id).first()
+
+
+def count_created_draft(sender, **kwargs):
+    """
+    Counts a new session submission. Only connected to the session
+    submission classes of pages with a submission counter, see
+    ``WagtailFlexibleFormsConfig.ready()``.
+    """
+    if not kwargs["created"]:
+        return
+    page = get_form_page_with(
+        kwargs["instance"], "get_submission_counter_class"
+    )
+    if page is not None:
+        page.update_submission_counter(drafts=1)
+
+
+def count_deleted_submission(sender, **kwargs):
+    """
+    Counts a deleted session or final submission. Only connected to the
+    submission classes of pages with a submission counter, see
+    ``WagtailFlexibleFormsConfig.ready()``.
+    """
+    instance = kwargs["instance"]
+    page = get_form_page_with(instance, "get_submission_counter_class")
+    if page is None:
+        return
+    if issubclass(sender, AbstractSessionFormSubmission):
+        page.update_submission_counter(drafts=-1)
+    if issubclass(sender, page.get_submission_class()):
+        page.update_submission_counter(
+            submissions=-1,
+            deleted_submit_time=instance.submit_time,
+        )
+
+
+def release_submission_blobs(sender, **kwargs):
+    """
+    Releases the upload blobs used by a deleted final submission. Only
+    connected to the submission classes of pages with upload blobs, see
+    ``WagtailFlexibleFormsConfig.ready()``.
+    """
+    instance = kwargs["instance"]
+    page = get_form_page_with(instance, "get_upload_blob_class")
+    if page is not None:
+        page.release_submission_blobs(instance)
+
+
+@receiver(page_published)
+def invalidate_form_cache(sender, **kwargs):
+    if issubclass(sender, StreamFormMixin):
+        form_cache.invalidate(kwargs["instance"].pk)
+
+
 class StreamFormMixin:
     """
     Adds StreamForm builder functionality to a Wagtail Page.
@@ -691,13 +2265,31 @@ class StreamFormMixin:
     refactored into a single compatible API.
     """
 
-    submissions_list_view_class = SubmissionsListView
+    submissions_list_view_class = StreamFormSubmissionsListView
+
+    # When enabled, anonymous users are not given a session (and no cookie is
+    # set) until they first submit a valid step.
+    defer_session = False
+
+    # Directory of the storage where uploaded files are saved, see
+    # ``get_upload_path()``.
+    upload_directory = "stream_forms"
+
+    # Serves ``chunked_upload_path`` below the page, see
+    # ``get_chunked_upload_class()``. Wagtail strips leading dashes from
+    # slugs, so the default path cannot hide a child page.
+    chunked_upload_view_class = ChunkedUploadView
+    chunked_upload_path = "-uploads"
 
     preview_modes = [
         ("form", _("Form")),
         ("landing", _("Landing page")),
     ]
 
+    # Provided by the page.
+    pk: typing.Any
+    live: bool
+
     @property
     def current_step_session_key(self):
         return "%s:step" % self.pk
@@ -710,6 +2302,14 @@ class StreamFormMixin:
             self.steps = steps
         return self.steps
 
+    def get_form_schema(self):
+        """
+        Returns the compiled ``FormSchema`` of ``form_fields``.
+        """
+        if getattr(self, "_form_schema", None) is None:
+            self._form_schema = get_form_schema(self)
+        return self._form_schema
+
     def get_form_fields(self, by_step=False):
         if by_step:
             return [step.get_form_fields() for step in self.get_steps()]
@@ -725,7 +2325,7 @@ class StreamFormMixin:
         if step_value is not None and step_value.isdigit():
             self.steps.current = int(step_value) - 1
         form = self.steps.get_current_form()
-        enctype = get_form_enctype(form)
+        enctype = self.steps.current.get_form_enctype()
         context.update(
             steps=self.steps,
             step=self.steps.current,
@@ -740,6 +2340,215 @@ class StreamFormMixin:
     def get_storage(self):
         return default_storage
 
+    @staticmethod
+    def get_upload_blob_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractUploadBlob`` to store each uploaded content only once.
+        """
+
+    @staticmethod
+    def get_chunked_upload_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractChunkedUpload`` to accept resumable uploads in chunks.
+        """
+
+    @staticmethod
+    def get_submission_counter_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractSubmissionCounter`` to keep count of submissions, rather
+        than counting them when displayed.
+        """
+
+    def update_submission_counter(
+        self,
+        drafts=0,
+        submissions=0,
+        submit_time=None,
+        deleted_submit_time=None,
+    ):
+        """
+        Updates the counter of the page, if any, see
+        ``get_submission_counter_class()``.
+        """
+        SubmissionCounter = self.get_submission_counter_class()
+        if SubmissionCounter is None:
+            return
+        SubmissionCounter.add(self, drafts, submissions, submit_time)
+        if deleted_submit_time is not None:
+            # The latest submission was deleted: finds the previous one.
+            Submission = self.get_submission_class()
+            SubmissionCounter.objects.filter(
+                page_id=self.pk, last_submit_time__lte=deleted_submit_time
+            ).update(
+                last_submit_time=models.Subquery(
+                    Submission.objects.filter(page_id=self.pk)
+                    .order_by("-submit_time")
+                    .values("submit_time")[:1]
+                )
+            )
+
+    @staticmethod
+    def get_submission_value_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractSubmissionValue`` to index the values of final submissions,
+        and filter them by answer.
+        """
+
+    def filter_submissions_by_value(self, queryset, field_name, value):
+        """
+        Filters ``queryset`` down to the final submissions which have
+        ``value`` in field ``field_name``. Requires a submission value class.
+        """
+        Value = self.get_submission_value_class()
+        if Value is None:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} does not index submission values, "
+                "see get_submission_value_class()."
+            )
+        return Value.filter_submissions(self, queryset, field_name, value)
+
+    @staticmethod
+    def get_answer_statistic_class():
+        """
+        Override this to return something that inherits from
+        ``AbstractAnswerStatistic`` to count the answers to choice fields.
+        """
+
+    def store_upload(self, file):
+        """
+        Saves an uploaded file to ``get_storage()`` and returns its path.
+        """
+        storage = self.get_storage()
+        Blob = self.get_upload_blob_class()
+        if Blob is not None:
+            content_hash = get_content_hash(file)
+            path = Blob.acquire(
+                storage,
+                file,
+                self.get_upload_blob_path(content_hash, file.name),
+                content_hash=content_hash,
+            )
+            if isinstance(file, StoredUploadedFile):
+                file.is_committed = True  # Moved or deleted by the blob.
+            return path
+        if isinstance(file, StoredUploadedFile) and file.storage is storage:
+            # Already written by ``StreamFormUploadHandler``.
+            file.is_committed = True
+            return file.path
+        return storage.save(self.get_upload_path(file.name), file)
+
+    def release_upload(self, path):
+        """
+        Deletes an uploaded file which is no longer used by a submission.
+        """
+        storage = self.get_storage()
+        Blob = self.get_upload_blob_class()
+        if Blob is not None and Blob.release(storage, path):
+            return
+        delete_upload(storage, path)
+
+    def release_submission_blobs(self, submission):
+        """
+        Removes the references of a deleted final ``submission`` to its
+        upload blobs. Final submissions store the URLs of their files, which
+        are mapped back to blob paths. Files which are not blobs are kept.
+        """
+        storage = self.get_storage()
+        Blob = self.get_upload_blob_class()
+        for name in self.get_form_schema().file_fields:
+            url = submission.form_data.get(name)
+            if not isinstance(url, str):
+                continue
+            path = find_upload_path(url, [self.upload_directory])
+            if path is not None:
+                Blob.release(storage, path)
+
+    def get_upload_blob_path(self, content_hash, file_name):
+        """
+        Returns the path of a file stored by ``AbstractUploadBlob``. Only the
+        extension of the name is kept, as the file may be shared by several
+        submissions.
+        """
+        return "/".join(
+            (
+                self.upload_directory,
+                "blobs",
+                content_hash[:2],
+                content_hash[2:4],
+                content_hash + Path(file_name).suffix.lower(),
+            )
+        )
+
+    def get_upload_path(self, file_name, directory=None):
+        """
+        Returns a new, unique path in ``get_storage()`` for an uploaded file,
+        in ``directory`` which defaults to ``upload_directory``. Files are
+        sharded by a random UUID, which avoids both collisions and large
+        directories::
+
+            stream_forms/3f/a2/3fa2.../file_name.pdf
+        """
+        key = uuid.uuid4().hex
+        return "/".join(
+            (
+                directory or self.upload_directory,
+                key[:2],
+                key[2:4],
+                key,
+                self.get_storage().get_valid_name(file_name),
+            )
+        )
+
+    def get_final_upload_directory(self):
+        """
+        Directory where the files of completed submissions are moved to, see
+        ``finalize_uploads()``.
+        """
+        return f"{self.upload_directory}/submissions"
+
+    def finalize_uploads(self, session):
+        """
+        Moves the files of a completed session submission to
+        ``get_final_upload_directory()``, renaming them where the storage
+        allows it. Paths are updated in the session submission, with a single
+        query. Upload blobs are shared, so they are not moved.
+        """
+        if self.get_upload_blob_class() is not None:
+            return
+        files = session.get_files_by_field()
+        if not files:
+            return
+        storage = self.get_storage()
+        directory = self.get_final_upload_directory()
+        moved = {}
+        try:
+            for path in files.values():
+                moved[path] = move_upload(
+                    storage,
+                    path,
+                    self.get_upload_path(Path(path).name, directory=directory),
+                )
+        except Exception:
+            # Puts back the files already moved.
+            for path, new_path in moved.items():
+                move_upload(storage, new_path, path)
+            raise
+
+        steps_data = json.loads(session.form_data)
+        for step_data in steps_data:
+            for name, value in step_data.items():
+                if isinstance(value, str) and value in moved:
+                    step_data[name] = moved[value]
+        session.form_data = json.dumps(steps_data, cls=StreamFormJSONEncoder)
+        # Not a change made by the user: no revision is created.
+        type(session).objects.filter(pk=session.pk).update(
+            form_data=session.form_data
+        )
+
     @staticmethod
     def get_form_class_bases():
         return (forms.Form,)
@@ -766,33 +2575,21 @@ class StreamFormMixin:
     def get_session_submission(self, request):
         Submission = self.get_session_submission_class()
         if request.user.is_authenticated:
-            user_submission = (
-                Submission.objects.filter(user=request.user, page=self)
-                .order_by("-pk")
-                .first()
-            )
-            if user_submission is None:
-                return Submission(user=request.user, page=self, form_data="[]")
-            return user_submission
-
-        # Ensure that anonymous users get a session key.
-        if not request.session.session_key:
-            request.session.create()
-
-        user_submission = (
-            Submission.objects.filter(
-                session_key=request.session.session_key, page=self
-            )
-            .order_by("-pk")
-            .first()
-        )
-        if user_submission is None:
-            return Submission(
-                session_key=request.session.session_key,
-                page=self,
-                form_data="[]",
-            )
-        return user_submission
+            lookup = {"user": request.user}
+        else:
+            # Ensure that anonymous users get a session key.
+            if not request.session.session_key:
+                if self.defer_session:
+                    # Nothing can be stored yet, see ``Steps.ensure_session()``.
+                    return Submission(page=self, form_data="[]")
+                request.session.create()
+            lookup = {"session_key": request.session.session_key}
+
+        # Both lookups are unique per page, see ``unique_together``.
+        try:
+            return Submission.objects.get(page=self, **lookup)
+        except Submission.DoesNotExist:
+            return Submission(page=self, form_data="[]", **lookup)
 
     def create_final_submission(self, request, delete_session=True):
         """
@@ -801,23 +2598,86 @@ class StreamFormMixin:
 
         ``delete_session`` will delete all temporary ``SessionSubmission`` and
         ``SubmissionRevision`` objects from the database.
+
+        Final submissions only link to verified images: if images of the
+        session submission are still pending, they are processed in the
+        background, which then creates the final submission, and ``None`` is
+        returned.
+        """
+        session = self.get_steps(request).get_session_submission()
+        if session.image_status == session.IMAGES_PENDING:
+            session.schedule_image_processing(
+                session.get_deferred_images(),
+                complete=True,
+                delete_session=delete_session,
+            )
+            return None
+        return self.finalize_session_submission(session, delete_session)
+
+    def finalize_session_submission(self, session, delete_session=True):
+        """
+        Creates the final submission of the completed ``session``
+        submission, see ``create_final_submission()``.
         """
-        session = self.get_session_submission(request)
+        self.finalize_uploads(session)
         submission_data = session.get_data()
         if "user" in submission_data:
             submission_data["user"] = str(submission_data["user"])
-        submission = FormSubmission.objects.create(
-            form_data=submission_data,
-            page=session.page,
-        )
+        # Values and answers are indexed from the cleaned data, as choices
+        # cannot always be told apart once displayed.
+        raw_data = session.get_data(raw=True, add_metadata=False)
+        with transaction.atomic():
+            submission = FormSubmission.objects.create(
+                form_data=submission_data,
+                page=session.page,
+            )
+            self.update_submission_counter(
+                submissions=1, submit_time=submission.submit_time
+            )
+            Value = self.get_submission_value_class()
+            if Value is not None:
+                Value.index_submission(self, submission, raw_data)
+            Statistic = self.get_answer_statistic_class()
+            if Statistic is not None:
+                Statistic.add(
+                    self,
+                    Statistic.count_answers(
+                        self.get_form_schema(), [raw_data], raw=True
+                    ),
+                )
 
         if delete_session:
             SubmissionRevision = session.get_revision_class()
-            SubmissionRevision.objects.filter(submission_id=session.id).delete()
+            SubmissionRevision.objects.for_submission(session).delete()
+            Outbox = session.get_revision_outbox_class()
+            if Outbox is not None:
+                Outbox.objects.filter(
+                    **SubmissionRevision.get_filters_for(session)
+                ).delete()
             session.delete()
 
         return submission
 
+    def route(self, request, path_components):
+        if (
+            path_components
+            and path_components[0] == self.chunked_upload_path
+            and len(path_components) <= 2
+            and self.get_chunked_upload_class() is not None
+        ):
+            if not self.live:
+                raise Http404
+            upload_id = path_components[1] if len(path_components) > 1 else ""
+            return RouteResult(self, kwargs={"chunked_upload": upload_id})
+        return super().route(request, path_components)
+
+    def serve_chunked_upload(self, request, upload_id):
+        """
+        Returns the chunked upload view, see ``ChunkedUploadView``.
+        """
+        view = self.chunked_upload_view_class.as_view(page=self)
+        return view(request, upload_id=upload_id)
+
     def get_landing_page_template(self, request, *args, **kwargs):
         return self.landing_page_template
 
@@ -846,14 +2706,18 @@ class StreamFormMixin:
         Override this method if you'd like to customize how each step, including
         the final submission, is processed.
         """
+        if "chunked_upload" in kwargs:
+            return self.serve_chunked_upload(request, kwargs["chunked_upload"])
         context = self.get_context(request)
         form = context["form"]
         if request.method == "POST" and form.is_valid():
-            is_complete = self.steps.update_data()
+            is_complete = self.steps.update_data(form)
             if is_complete:
                 self.create_final_submission(request, delete_session=True)
                 return self.render_landing_page(request, *args, **kwargs)
             return HttpResponseRedirect(self.url)
+        if request.method == "POST":
+            self.steps.discard_uploads()
         return super().serve(request, *args, **kwargs)
 
     def serve_preview(self, request, mode_name):
@@ -880,13 +2744,7 @@ class StreamFormMixin:
 
     def get_data_fields(self, by_step=False, add_metadata=True):
         if by_step:
-            stepfields = []
-            for step_fields in self.get_form_fields(by_step=True):
-                fieldtuples = []
-                for field_name, field in step_fields.items():
-                    fieldtuples.append((field_name, field.label))
-                stepfields.append(fieldtuples)
-            return stepfields
+            return self.get_form_schema().get_data_fields(by_step=True)
 
         data_fields = []
         if add_metadata:
@@ -899,13 +2757,7 @@ class StreamFormMixin:
                 )
             )
 
-        # Flatten the nested set of steps -> fields into a list of fields.
-        stepfields = []
-        for step_data_fields in self.get_data_fields(by_step=True):
-            for entry in step_data_fields:
-                stepfields.append(entry)
-
-        data_fields.extend(stepfields)
+        data_fields.extend(self.get_form_schema().get_data_fields())
         return data_fields
 
     def format_value(self, field, value):
@@ -0,0 +1,180 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from wagtail.admin.paginator import WagtailPaginator
+
+
+class KeysetPage(Sequence):
+    """
+    A page of a ``KeysetPaginator``. The previous and next "page numbers" are
+    tokens holding the ordering values of the first and last items, rather
+    than numbers, so they can be used in ``?p=`` links like any page number.
+    """
+
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def next_page_number(self):
+        return self.paginator.get_token(
+            self.number + 1, self.paginator.AFTER, self.object_list[-1]
+        )
+
+    def previous_page_number(self):
+        if not self.object_list:
+            return 1
+        return self.paginator.get_token(
+            self.number - 1, self.paginator.BEFORE, self.object_list[0]
+        )
+
+
+class KeysetPaginator(WagtailPaginator):
+    """
+    Paginates a queryset by the values of its ordering fields, rather than
+    by offset, so that fetching any page costs the same as fetching the
+    first one. The primary key is added to ``ordering`` to make it unique.
+
+    Pages can only be browsed one after the other: there are no links to
+    arbitrary page numbers. ``count`` can be given when it is already known,
+    for example from a submission counter.
+    """
+
+    AFTER = "a"
+    BEFORE = "b"
+
+    def __init__(
+        self, object_list, per_page, ordering=(), count=None, **kwargs
+    ):
+        pk_name = object_list.model._meta.pk.name
+        self.ordering = []
+        for order in ordering:
+            descending = order.startswith("-")
+            name = order.lstrip("-")
+            if name == "pk":
+                name = pk_name
+            self.ordering.append((name, descending))
+        if pk_name not in (name for name, descending in self.ordering):
+            descending = self.ordering[0][1] if self.ordering else False
+            self.ordering.append((pk_name, descending))
+        super().__init__(
+            object_list.order_by(*self.get_order_by()), per_page, **kwargs
+        )
+        if count is not None:
+            self.count = count
+
+    def get_elided_page_range(self, page_number):
+        return []
+
+    def get_order_by(self, reverse=False):
+        return [
+            ("-" if descending != reverse else "") + name
+            for name, descending in self.ordering
+        ]
+
+    def get_token(self, number, direction, item):
+        values = [
+            item._meta.get_field(name).value_to_string(item)
+            for name, descending in self.ordering
+        ]
+        key = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+        return f"{number}-{direction}-{key.rstrip('=')}"
+
+    def parse_token(self, token):
+        """
+        Returns the page number, direction and ordering values of ``token``,
+        or ``None`` if it is not valid.
+        """
+        try:
+            page_number, direction, key = str(token).split("-", 2)
+            number = max(int(page_number), 1)
+            key += "=" * (-len(key) % 4)
+            values = json.loads(base64.urlsafe_b64decode(key))
+            model = self.object_list.model
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, descending), value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+        if direction not in (self.AFTER, self.BEFORE) or len(values) != len(
+            self.ordering
+        ):
+            return None
+        return number, direction, values
+
+    def get_keyset_filter(self, values, reverse=False):
+        """
+        Returns a filter of the items after ``values`` in the ordering, or
+        before them if ``reverse`` is set.
+        """
+        condition = None
+        for (name, descending), value in reversed(
+            list(zip(self.ordering, values))
+        ):
+            operator = "lt" if descending != reverse else "gt"
+            lookup = f"{name}__{operator}"
+            if condition is None:
+                condition = Q(**{lookup: value})
+            else:
+                condition = Q(**{lookup: value}) | (
+                    Q(**{name: value}) & condition
+                )
+        # Redundant, but lets the database scan an index from the first value.
+        name, descending = self.ordering[0]
+        operator = "lte" if descending != reverse else "gte"
+        lookup = f"{name}__{operator}"
+        return Q(**{lookup: values[0]}) & condition
+
+    def page(self, number):
+        parsed = self.parse_token(number)
+        queryset = self.object_list
+        if parsed is None:
+            number, direction = 1, None
+        else:
+            number, direction, values = parsed
+            reverse = direction == self.BEFORE
+            queryset = queryset.filter(
+                self.get_keyset_filter(values, reverse=reverse)
+            ).order_by(*self.get_order_by(reverse=reverse))
+        items = list(queryset[: self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[: self.per_page]
+        if direction == self.BEFORE:
+            items.reverse()
+            if not has_more:
+                # Back to the start: the first page.
+                number = 1
+            return KeysetPage(items, number, self, has_more, True)
+        return KeysetPage(items, number, self, direction is not None, has_more)
+
+    def get_page(self, number):
+        return self.page(number)
+
+    def validate_number(self, number):
+        parsed = self.parse_token(number)
+        return 1 if parsed is None else parsed[0]
@@ -0,0 +1,42 @@
+import typing
+
+from django.db.models.query import ModelIterable
+from wagtail.models import Page
+
+
+class FormPageIterable(ModelIterable):
+    """
+    Yields submissions with their ``page`` set to the specific page,
+    fetching each page only once.
+    """
+
+    # Pages known in advance, by ID, see ``with_form_page()``.
+    pages: typing.ClassVar[dict] = {}
+
+    def __iter__(self):
+        pages = dict(self.pages)
+        for submission in super().__iter__():
+            page = pages.get(submission.page_id)
+            if page is None:
+                page = Page.objects.get(pk=submission.page_id).specific
+                pages[submission.page_id] = page
+            submission.page = page
+            yield submission
+
+
+def with_form_page(queryset, page=None):
+    """
+    Returns a copy of ``queryset``, a queryset of session or final
+    submissions, which resolves the specific page of each submission once
+    per page rather than once per submission. Submissions of the same page
+    share the page instance, and therefore its compiled ``FormSchema``, and
+    no query is made for ``page`` if it is given.
+    """
+    clone = queryset._chain()
+    clone._iterable_class = FormPageIterable
+    if page is not None:
+        # Kept by the clones of the queryset, e.g. when it is sliced.
+        clone._iterable_class = type(
+            "FormPageIterable", (FormPageIterable,), {"pages": {page.pk: page}}
+        )
+    return clone
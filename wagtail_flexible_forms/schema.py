@@ -0,0 +1,175 @@
+import threading
+from collections import OrderedDict
+
+from django import forms
+
+from .blocks import FormFieldBlock
+from .blocks import FormStepBlock
+from .cache import form_cache
+from .cache import get_stream_signature
+
+
+class FieldSchema:
+    """
+    A form field compiled from a ``FormFieldBlock`` value.
+
+    ``field`` is a prototype instance of the Django form field. Forms deep
+    copy their declared fields when instantiated, so it must not be modified.
+    """
+
+    __slots__ = ("block", "field", "slug", "struct_value")
+
+    def __init__(self, slug, block, struct_value, field):
+        self.slug = slug
+        self.block = block
+        self.struct_value = struct_value
+        self.field = field
+
+    @property
+    def label(self):
+        return self.field.label
+
+    @property
+    def is_file(self):
+        return isinstance(self.field, forms.FileField)
+
+    @property
+    def is_image(self):
+        return isinstance(self.field, forms.ImageField)
+
+
+class StepSchema:
+    """
+    A compiled step of a stream form.
+
+    ``slugs`` contains one entry per child of the step's stream, in order:
+    the field slug for form fields, or ``None`` for any other block.
+    """
+
+    def __init__(self, index, name, slugs, fields):
+        self.index = index
+        self.name = name
+        self.slugs = slugs
+        self.fields = fields
+        self.file_fields = tuple(
+            slug for slug, field in fields.items() if field.is_file
+        )
+        # Form classes by tuple of base classes.
+        self._form_classes = {}
+        self._lock = threading.Lock()
+
+    def get_form_class(self, bases):
+        bases = tuple(bases)
+        with self._lock:
+            form_class = self._form_classes.get(bases)
+            if form_class is None:
+                attrs = OrderedDict(
+                    (slug, field.field) for slug, field in self.fields.items()
+                )
+                form_class = type("WagtailForm", bases, attrs)
+                self._form_classes[bases] = form_class
+        return form_class
+
+    def get_form_enctype(self, bases):
+        form_class = self.get_form_class(bases)
+        for field in form_class.base_fields.values():
+            if isinstance(field.widget, forms.ClearableFileInput):
+                return "multipart/form-data"
+        return "application/x-www-form-urlencoded"
+
+
+class FormSchema:
+    """
+    Everything needed to build, validate and format a stream form, compiled
+    from the raw JSON data of its ``StreamField``.
+    """
+
+    def __init__(self, steps, has_steps):
+        self.steps = steps
+        self.has_steps = has_steps
+        self.fields = OrderedDict()
+        for step in steps:
+            self.fields.update(step.fields)
+        self.file_fields = tuple(
+            slug for slug, field in self.fields.items() if field.is_file
+        )
+        # Value formatters by submission class, see
+        # ``AbstractSessionFormSubmission.get_value_formatters()``.
+        self.formatters = {}
+
+    def get_data_fields(self, by_step=False):
+        if by_step:
+            return [
+                [(slug, field.label) for slug, field in step.fields.items()]
+                for step in self.steps
+            ]
+        return [(slug, field.label) for slug, field in self.fields.items()]
+
+
+def compile_step(index, name, stream_block, raw_children):
+    """
+    Compiles the raw children of a stream of form fields. Only form field
+    blocks are converted to Python values; content blocks such as rich text
+    or images are skipped.
+    """
+    slugs: list = []
+    fields = OrderedDict()
+    for raw_child in raw_children:
+        block = stream_block.child_blocks.get(raw_child["type"])
+        if block is None:
+            # Wagtail drops blocks which no longer exist in the definition.
+            continue
+        if not isinstance(block, FormFieldBlock):
+            slugs.append(None)
+            continue
+        struct_value = block.to_python(raw_child["value"])
+        slug = block.get_slug(struct_value)
+        fields[slug] = FieldSchema(
+            slug, block, struct_value, block.get_field(struct_value)
+        )
+        slugs.append(slug)
+    return StepSchema(index, name, slugs, fields)
+
+
+def compile_schema(stream_value) -> FormSchema:
+    stream_block = stream_value.stream_block
+    raw_data = [
+        raw_child
+        for raw_child in stream_value.raw_data
+        if raw_child["type"] in stream_block.child_blocks
+    ]
+    has_steps = any(
+        isinstance(stream_block.child_blocks[raw_child["type"]], FormStepBlock)
+        for raw_child in raw_data
+    )
+    if not has_steps:
+        return FormSchema(
+            [compile_step(0, "", stream_block, raw_data)], has_steps=False
+        )
+    steps = []
+    for index, raw_child in enumerate(raw_data):
+        block = stream_block.child_blocks[raw_child["type"]]
+        if isinstance(block, FormStepBlock):
+            value = raw_child["value"]
+            step = compile_step(
+                index,
+                value.get("name") or "",
+                block.child_blocks["form_fields"],
+                value.get("form_fields") or [],
+            )
+        else:
+            step = StepSchema(index, "", [], OrderedDict())
+        steps.append(step)
+    return FormSchema(steps, has_steps=True)
+
+
+def get_form_schema(page) -> FormSchema:
+    """
+    Returns the compiled schema of the page's ``form_fields``. Schemas are
+    shared between requests through ``form_cache``, keyed by page ID and a
+    hash of the raw ``form_fields`` data.
+    """
+    if page.pk is None:
+        return compile_schema(page.form_fields)
+    key = (page.pk, get_stream_signature(page.form_fields))
+    return form_cache.get_or_set(key, lambda: compile_schema(page.form_fields))
@@ -0,0 +1,436 @@
+import contextvars
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.core.files.uploadhandler import StopUpload
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from django.urls import Resolver404
+from django.urls import resolve
+
+
+def delete_empty_directories(storage, path):
+    """
+    Deletes the ancestor directories of ``path`` which are empty. Storages
+    without local paths have no directories to delete.
+    """
+    for directory in list(Path(path).parents)[:-1]:
+        try:
+            Path(storage.path(directory)).rmdir()
+        except (NotImplementedError, OSError):
+            # Not a local storage, or the directory is not empty.
+            return
+
+
+def find_upload_path(text, directories):
+    """
+    Returns the path below one of ``directories`` referenced by ``text``, a
+    path or a URL of the storage, or ``None``. Final submissions store the
+    URLs of their files, which may be quoted or signed.
+    """
+    text = unquote(text)
+    for directory in directories:
+        index = text.find(f"{directory}/")
+        if index >= 0:
+            # Signed URLs end with a query string.
+            return text[index:].split("?", 1)[0]
+    return None
+
+
+def delete_upload(storage, path):
+    """
+    Deletes an uploaded file, and its ancestor directories which are left
+    empty.
+    """
+    storage.delete(path)
+    delete_empty_directories(storage, path)
+
+
+def move_upload(storage, source, destination):
+    """
+    Moves an uploaded file within ``storage`` and returns its new name. Files
+    of local storages are renamed, others are copied then deleted.
+    """
+    try:
+        source_path = Path(storage.path(source))
+        destination_path = Path(storage.path(destination))
+    except NotImplementedError:
+        pass
+    else:
+        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(source_path, destination_path)
+        except OSError:
+            pass  # E.g. on another file system, copied below.
+        else:
+            delete_empty_directories(storage, source)
+            return destination
+    with storage.open(source, "rb") as file:
+        destination = storage.save(destination, file)
+    delete_upload(storage, source)
+    return destination
+
+
+def get_content_hash(file):
+    """
+    Returns the SHA-256 hex digest of an uploaded file, computed by
+    ``StreamFormUploadHandler`` if it was streamed to storage.
+    """
+    content_hash = getattr(file, "content_hash", None)
+    if content_hash is None:
+        hasher = hashlib.sha256()
+        for chunk in file.chunks():
+            hasher.update(chunk)
+        file.seek(0)
+        content_hash = hasher.hexdigest()
+    return content_hash
+
+
+def process_image(storage, path, max_dimension=None):
+    """
+    Fully decodes the image at ``path``, then removes its metadata (EXIF,
+    GPS position...) and downscales it to ``max_dimension`` pixels, if
+    needed. Returns ``False`` if the file is not a valid image, ``True`` if
+    it can be kept as is, or the cleaned up image as a new ``ContentFile``.
+    The file at ``path`` is never modified, as it may be shared.
+    """
+    from PIL import Image
+    from PIL import ImageOps
+
+    try:
+        with storage.open(path, "rb") as file, Image.open(file) as image:
+            image.load()
+            image_format = image.format
+            resize = max_dimension and max(image.size) > max_dimension
+            if not resize and not image.info.get("exif"):
+                return True
+            # Applies the EXIF orientation before dropping it.
+            transposed = ImageOps.exif_transpose(image)
+            if resize:
+                transposed.thumbnail((max_dimension, max_dimension))
+            output = io.BytesIO()
+            transposed.save(output, format=image_format)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return False
+    return ContentFile(output.getvalue(), name=Path(path).name)
+
+
+class ConcatenatedReader(io.RawIOBase):
+    """
+    Reads the files at ``paths`` in ``storage`` one after the other, as a
+    single stream. ``hasher`` is updated with the data read, if given.
+    """
+
+    def __init__(self, storage, paths, hasher=None):
+        self.storage = storage
+        self.paths = list(paths)
+        self.hasher = hasher
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.paths:
+                    return 0
+                self.current = self.storage.open(self.paths.pop(0), "rb")
+            data = self.current.read(len(buffer))
+            if data:
+                buffer[: len(data)] = data
+                if self.hasher is not None:
+                    self.hasher.update(data)
+                return len(data)
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+_image_executor = None
+_image_executor_lock = threading.Lock()
+
+
+def get_image_executor():
+    """
+    Returns the thread pool processing deferred images. Its size is set by
+    the ``WAGTAIL_FLEXIBLE_FORMS_IMAGE_WORKERS`` setting.
+    """
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is None:
+            _image_executor = ThreadPoolExecutor(
+                max_workers=getattr(
+                    settings, "WAGTAIL_FLEXIBLE_FORMS_IMAGE_WORKERS", 2
+                ),
+                thread_name_prefix="wagtail_flexible_forms",
+            )
+    return _image_executor
+
+
+class StoredUploadedFile(UploadedFile):
+    """
+    A file uploaded by ``StreamFormUploadHandler``, already written to
+    ``storage`` at ``path``. Set ``is_committed`` once the file is used by a
+    submission, see ``StreamFormMixin.store_upload()``.
+
+    The file is only opened once it is read, as most uploads are moved or
+    hashed without reading them again.
+    """
+
+    def __init__(
+        self,
+        storage,
+        path,
+        name,
+        content_type,
+        size,
+        charset,
+        content_type_extra=None,
+        content_hash=None,
+    ):
+        self._file = None
+        super().__init__(
+            None,
+            name,
+            content_type,
+            size,
+            charset,
+            content_type_extra,
+        )
+        self.storage = storage
+        self.path = path
+        self.content_hash = content_hash
+        self.is_committed = False
+
+    @property
+    def file(self):
+        if self._file is None:
+            self._file = self.storage.open(self.path, "rb")
+        return self._file
+
+    @file.setter
+    def file(self, file):
+        self._file = file
+
+    @property
+    def closed(self):
+        return self._file is not None and self._file.closed
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def delete(self):
+        self.close()
+        delete_upload(self.storage, self.path)
+
+
+# Files written by ``StreamFormUploadHandler`` during the current request.
+_request_uploads: contextvars.ContextVar = contextvars.ContextVar(
+    "wagtail_flexible_forms_uploads", default=None
+)
+
+
+@receiver(request_finished)
+def delete_uncommitted_uploads(sender, **kwargs):
+    """
+    Deletes the files written by ``StreamFormUploadHandler`` which were not
+    used by a submission, e.g. when the CSRF check or the step failed, and
+    closes the others.
+    """
+    uploads = _request_uploads.get()
+    if uploads is None:
+        return
+    _request_uploads.set(None)
+    for file in uploads:
+        if file.is_committed:
+            file.close()
+        else:
+            file.delete()
+
+
+def is_page_request(request):
+    """
+    Returns whether ``request`` is served by Wagtail's page view, and below
+    one of the URL path prefixes of the
+    ``WAGTAIL_FLEXIBLE_FORMS_UPLOAD_PATHS`` setting, if set. No query is
+    made.
+    """
+    prefixes = getattr(settings, "WAGTAIL_FLEXIBLE_FORMS_UPLOAD_PATHS", None)
+    if prefixes is not None and not request.path.startswith(tuple(prefixes)):
+        return False
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+    return match.url_name == "wagtail_serve"
+
+
+class StreamFormUploadHandler(FileUploadHandler):
+    """
+    Writes files uploaded to the file fields of stream form pages directly to
+    the storage of the page while the request is parsed, rather than to a
+    temporary file which is then copied. Only the file fields of the step
+    being submitted are handled. The upload is aborted as soon as a file is
+    larger than the field's ``max_upload_size``.
+
+    Other uploads are left to the next handlers. Add it first to the
+    ``FILE_UPLOAD_HANDLERS`` setting:
+
+    .. code-block:: python
+
+        FILE_UPLOAD_HANDLERS = [
+            "wagtail_flexible_forms.uploads.StreamFormUploadHandler",
+            "django.core.files.uploadhandler.MemoryFileUploadHandler",
+            "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+        ]
+
+    Files which are not used by a submission by the end of the request are
+    deleted.
+    """
+
+    destination = None
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        self.page = self.get_form_page()
+        self.max_upload_sizes = {}
+        if self.page is None:
+            return
+        self.storage = self.page.get_storage()
+        step = self.get_step_schema(self.page.get_form_schema())
+        if step is None:
+            return
+        for slug in step.file_fields:
+            field = step.fields[slug].field
+            self.max_upload_sizes[slug] = getattr(
+                field, "max_upload_size", None
+            )
+
+    def get_form_page(self):
+        from wagtail.models import Page
+
+        from .models import StreamFormMixin
+
+        if self.request is None or self.request.method != "POST":
+            return None
+        if not is_page_request(self.request):
+            return None
+        page = Page.find_for_request(self.request, self.request.path)
+        if page is None:
+            return None
+        page = page.specific
+        if not isinstance(page, StreamFormMixin):
+            return None
+        return page
+
+    def get_step_schema(self, schema):
+        """
+        Returns the schema of the step submitted by the request, or ``None``.
+        The step is selected like in ``StreamFormMixin.get_context()``.
+        """
+        session = getattr(self.request, "session", None)
+        index = 0
+        if session is not None:
+            index = session.get(self.page.current_step_session_key, 0)
+        step_value = self.request.GET.get("step")
+        if step_value is not None and step_value.isdigit():
+            index = int(step_value) - 1
+        if 0 <= index < len(schema.steps):
+            return schema.steps[index]
+        return None
+
+    def discard_destination(self):
+        """
+        Closes and deletes the file being written, if any.
+        """
+        if self.destination is not None:
+            if not self.destination.closed:
+                self.destination.close()
+            delete_upload(self.storage, self.path)
+            self.destination = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        # Left over if the previous file was not completed.
+        self.discard_destination()
+        if field_name not in self.max_upload_sizes:
+            return
+        self.max_upload_size = self.max_upload_sizes[field_name]
+        self.size = 0
+        # Hashed as it is received, for ``AbstractUploadBlob``.
+        self.hasher = None
+        if self.page.get_upload_blob_class() is not None:
+            self.hasher = hashlib.sha256()
+        self.path = self.page.get_upload_path(self.file_name)
+        try:
+            directory = Path(self.storage.path(self.path)).parent
+        except NotImplementedError:
+            pass  # Remote storages have no directories.
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.destination = self.storage.open(self.path, "wb")
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.destination is None:
+            return raw_data
+        self.size += len(raw_data)
+        if (
+            self.max_upload_size is not None
+            and self.size > self.max_upload_size
+        ):
+            # Too large: the rest of the request is not read.
+            self.discard_destination()
+            raise StopUpload(connection_reset=True)
+        self.destination.write(raw_data)
+        if self.hasher is not None:
+            self.hasher.update(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.destination is None:
+            return None
+        self.destination.close()
+        self.destination = None
+        file = StoredUploadedFile(
+            self.storage,
+            self.path,
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            self.content_type_extra,
+            self.hasher.hexdigest() if self.hasher is not None else None,
+        )
+        uploads = _request_uploads.get()
+        if uploads is None:
+            uploads = []
+            _request_uploads.set(uploads)
+        uploads.append(file)
+        return file
+
+    def upload_interrupted(self):
+        self.discard_destination()
+
+    def upload_complete(self):
+        self.discard_destination()
@@ -0,0 +1,394 @@
+import typing
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy
+from django.views.generic import TemplateView
+from django.views.generic import View
+from django_filters import CharFilter
+from django_filters import ChoiceFilter
+from wagtail.admin.views.generic.base import WagtailAdminTemplateMixin
+from wagtail.admin.widgets.button import Button
+from wagtail.contrib.forms.utils import get_forms_for_user
+from wagtail.contrib.forms.views import SubmissionsListFilterSet
+from wagtail.contrib.forms.views import SubmissionsListView
+from wagtail.models import Page
+
+from .exports import SubmissionExporter
+from .pagination import KeysetPaginator
+from .querysets import with_form_page
+
+
+class StreamFormSubmissionsFilterSet(SubmissionsListFilterSet):
+    """
+    Adds filters by answer to a field, for pages which index the values of
+    their submissions, see ``StreamFormMixin.get_submission_value_class()``.
+    """
+
+    field = ChoiceFilter(
+        label=gettext_lazy("Field"),
+        method="filter_by_value",
+    )
+    value = CharFilter(
+        label=gettext_lazy("Answer"),
+        method="filter_by_value",
+    )
+
+    def __init__(self, *args, form_page=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.form_page = form_page
+        if form_page is None or form_page.get_submission_value_class() is None:
+            del self.filters["field"]
+            del self.filters["value"]
+            return
+        schema = form_page.get_form_schema()
+        self.filters["field"].extra["choices"] = [
+            (slug, field.label)
+            for slug, field in schema.fields.items()
+            if not field.is_file
+        ]
+
+    def filter_by_value(self, queryset, name, value):
+        # Both filters are applied together, in ``filter_queryset()``.
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        field_name = self.form.cleaned_data.get("field")
+        value = self.form.cleaned_data.get("value")
+        if field_name and value:
+            queryset = self.form_page.filter_submissions_by_value(
+                queryset, field_name, value
+            )
+        return queryset
+
+
+class StreamFormSubmissionsListView(SubmissionsListView):
+    """
+    Lists submissions of a stream form page. Exports are streamed by a
+    ``SubmissionExporter`` rather than built in memory.
+    """
+
+    FORMAT_NDJSON = "ndjson"
+    FORMATS = SubmissionsListView.FORMATS + (FORMAT_NDJSON,)
+
+    exporter_class = SubmissionExporter
+    paginator_class = KeysetPaginator
+    filterset_class = StreamFormSubmissionsFilterSet
+
+    def get_filterset_kwargs(self):
+        kwargs = super().get_filterset_kwargs()
+        kwargs["form_page"] = self.form_page
+        return kwargs
+
+    @cached_property
+    def data_fields(self):
+        return self.form_page.get_data_fields()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """
+        Pages are fetched by keyset on the ordering fields (``submit_time``
+        and ``id``), so later pages are as fast as the first one. The total
+        is read from the page's submission counter when it has one.
+        """
+        count = None
+        Counter = self.form_page.get_submission_counter_class()
+        if Counter is not None and not self.is_filtering:
+            count = Counter.get_for_page(self.form_page).submission_count
+        return self.paginator_class(
+            queryset,
+            per_page,
+            ordering=self.ordering,
+            count=count,
+            **kwargs,
+        )
+
+    def get_context_data(self, **kwargs):
+        if self.is_export:
+            return super().get_context_data(**kwargs)
+        # Rows are built below, from columns computed once.
+        context = super(SubmissionsListView, self).get_context_data(**kwargs)
+        names = [name for name, label in self.data_fields]
+        data_rows = []
+        for submission in context[self.context_object_name]:
+            form_data = submission.get_data()
+            data_rows.append(
+                {
+                    "model_id": submission.id,
+                    "fields": [
+                        self.format_cell(form_data.get(name)) for name in names
+                    ],
+                }
+            )
+        ordering_by_field = self.get_validated_ordering()
+        data_headings = []
+        for name, label in self.data_fields:
+            order_label = None
+            if name in self.orderable_fields:
+                order = ordering_by_field.get(name)
+                order_label = order[1] if order else "orderable"
+            data_headings.append(
+                {"name": name, "label": label, "order": order_label}
+            )
+        context.update(
+            form_page=self.form_page,
+            data_headings=data_headings,
+            data_rows=data_rows,
+            next_url=f"{self.get_index_url()}?{self.request.GET.urlencode()}",
+        )
+        return context
+
+    @staticmethod
+    def format_cell(value):
+        if isinstance(value, list):
+            return ", ".join(value)
+        return value
+
+    def get_base_queryset(self):
+        Submission = self.form_page.get_submission_class()
+        # All rows belong to the same page: avoid fetching it per row.
+        return with_form_page(
+            Submission.objects.filter(page=self.form_page), self.form_page
+        )
+
+    def get_exporter(self, queryset):
+        return self.exporter_class(self.form_page, queryset)
+
+    def as_spreadsheet(self, queryset, spreadsheet_format):
+        return self.get_exporter(queryset).as_response(
+            spreadsheet_format, self.get_filename()
+        )
+
+    @property
+    def ndjson_export_url(self):
+        return self.get_export_url(self.FORMAT_NDJSON)
+
+    @cached_property
+    def header_more_buttons(self):
+        buttons = super().header_more_buttons.copy()
+        if self.form_page.get_answer_statistic_class() is not None:
+            buttons.append(
+                Button(
+                    _("Answer statistics"),
+                    url=reverse(
+                        "wagtail_flexible_forms_answer_statistics",
+                        args=(self.form_page.pk,),
+                    ),
+                    icon_name="table",
+                    priority=120,
+                )
+            )
+        if self.show_export_buttons:
+            buttons.append(
+                Button(
+                    _("Download NDJSON"),
+                    url=self.ndjson_export_url,
+                    icon_name="download",
+                    priority=110,
+                )
+            )
+        return buttons
+
+
+class ChunkedUploadView(View):
+    """
+    Resumable uploads of large files to the file fields of a stream form
+    page, sent in chunks, see ``AbstractChunkedUpload``:
+
+    * ``POST -uploads/`` with ``field``, ``name`` and ``size`` starts an
+      upload, replacing any previous upload of the same field.
+    * ``GET -uploads/<id>/`` returns the offset of an upload, from which it
+      can be resumed.
+    * ``PATCH -uploads/<id>/`` with an ``Upload-Offset`` header sends the
+      next chunk, as the raw request body.
+    * ``DELETE -uploads/<id>/`` cancels an upload.
+
+    The ID of a complete upload is then submitted in the
+    ``<field>__upload_id`` field of the form, instead of the file.
+    """
+
+    http_method_names: typing.ClassVar[list] = [
+        "get",
+        "post",
+        "patch",
+        "delete",
+    ]
+
+    # The stream form page, passed to ``as_view()``.
+    page: typing.Any = None
+
+    def get_max_chunk_size(self):
+        return getattr(
+            settings,
+            "WAGTAIL_FLEXIBLE_FORMS_MAX_CHUNK_SIZE",
+            8 * 1024 * 1024,
+        )
+
+    def dispatch(self, request, upload_id=""):
+        self.ChunkedUpload = self.page.get_chunked_upload_class()
+        if not upload_id:
+            if request.method != "POST":
+                return self.http_method_not_allowed(request)
+            return self.create(request)
+        try:
+            self.upload_id = uuid.UUID(upload_id)
+        except ValueError:
+            raise Http404
+        return super().dispatch(request)
+
+    def error(self, message, status=400, **kwargs):
+        return JsonResponse({"error": message, **kwargs}, status=status)
+
+    def as_json(self, upload, status=200):
+        return JsonResponse(
+            {
+                "id": str(upload.pk),
+                "offset": upload.offset,
+                "size": upload.size,
+                "complete": upload.is_complete,
+            },
+            status=status,
+        )
+
+    def get_queryset(self):
+        owner = self.ChunkedUpload.get_owner_filters(self.request)
+        if owner is None:
+            return self.ChunkedUpload.objects.none()
+        return self.ChunkedUpload.objects.filter(page=self.page, **owner)
+
+    def get_upload(self, for_update=False):
+        queryset = self.get_queryset()
+        if for_update:
+            queryset = queryset.select_for_update()
+        try:
+            return queryset.get(pk=self.upload_id)
+        except self.ChunkedUpload.DoesNotExist:
+            raise Http404
+
+    def create(self, request):
+        schema = self.page.get_form_schema()
+        field_name = request.POST.get("field", "")
+        if field_name not in schema.file_fields:
+            return self.error(_("Unknown file field."))
+        file_name = request.POST.get("name", "")
+        if not file_name:
+            return self.error(_("The file name is required."))
+        try:
+            size = int(request.POST.get("size", ""))
+        except ValueError:
+            return self.error(_("The file size is required."))
+        if size <= 0:
+            return self.error(_("The submitted file is empty."))
+        max_upload_size = getattr(
+            schema.fields[field_name].field, "max_upload_size", None
+        )
+        if max_upload_size is not None and size > max_upload_size:
+            return self.error(_("The file is too large."), status=413)
+
+        owner = self.ChunkedUpload.get_owner_filters(request, create=True)
+        with transaction.atomic():
+            for upload in self.ChunkedUpload.objects.filter(
+                page=self.page, field_name=field_name, **owner
+            ).select_for_update():
+                upload.discard(self.page)
+            upload = self.ChunkedUpload.objects.create(
+                page=self.page,
+                field_name=field_name,
+                file_name=file_name[:255],
+                content_type=request.POST.get("content_type", "")[:255],
+                size=size,
+                **owner,
+            )
+        return self.as_json(upload, status=201)
+
+    def get(self, request):
+        return self.as_json(self.get_upload())
+
+    def patch(self, request):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return self.error(
+                _("Upload-Offset and Content-Length headers are required.")
+            )
+        if length > self.get_max_chunk_size():
+            return self.error(_("The chunk is too large."), status=413)
+        with transaction.atomic():
+            upload = self.get_upload(for_update=True)
+            if upload.is_complete or offset != upload.offset:
+                # Lets the client resume from the right offset.
+                return self.error(
+                    _("Wrong upload offset."),
+                    status=409,
+                    offset=upload.offset,
+                )
+            if length <= 0 or offset + length > upload.size:
+                return self.error(_("Wrong chunk size."))
+            if not upload.write_chunk(self.page, request, length):
+                return self.error(
+                    _("The chunk is incomplete."),
+                    offset=upload.offset,
+                )
+        return self.as_json(upload)
+
+    post = patch
+
+    def delete(self, request):
+        with transaction.atomic():
+            self.get_upload(for_update=True).discard(self.page)
+        return HttpResponse(status=204)
+
+
+class AnswerStatisticsView(WagtailAdminTemplateMixin, TemplateView):
+    """
+    Shows the answers to the choice fields of a stream form page, read from
+    its answer statistics in a single query, see
+    ``StreamFormMixin.get_answer_statistic_class()``.
+    """
+
+    template_name = "wagtail_flexible_forms/answer_statistics.html"
+    page_title = gettext_lazy("Answer statistics")
+    header_icon = "form"
+
+    def dispatch(self, request, page_id):
+        self.form_page = get_object_or_404(Page, id=page_id).specific
+        get_statistic_class = getattr(
+            self.form_page, "get_answer_statistic_class", None
+        )
+        if get_statistic_class is None or get_statistic_class() is None:
+            raise Http404
+        if not get_forms_for_user(request.user).filter(pk=page_id).exists():
+            raise PermissionDenied
+        return super().dispatch(request, page_id)
+
+    def get_page_subtitle(self):
+        return self.form_page.get_admin_display_title()
+
+    def get_breadcrumbs_items(self):
+        return self.breadcrumbs_items + [
+            {"url": reverse("wagtailforms:index"), "label": _("Forms")},
+            {
+                "url": "",
+                "label": self.get_page_title(),
+                "sublabel": self.get_page_subtitle(),
+            },
+        ]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        Statistic = self.form_page.get_answer_statistic_class()
+        context.update(
+            form_page=self.form_page,
+            summary=Statistic.get_summary(self.form_page),
+        )
+        return context
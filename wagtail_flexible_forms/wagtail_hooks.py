@@ -1,9 +1,11 @@
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.urls import path
 from wagtail import hooks
-from wagtail.models import get_page_models
 from wagtail.permissions import page_permission_policy
 
-from wagtail_flexible_forms.models import StreamFormMixin
+from wagtail_flexible_forms.views import AnswerStatisticsView
 
 
 @hooks.register("filter_form_submissions_for_user")
@@ -12,12 +14,10 @@ def stream_forms(user, editable_forms):
     Append Page instances derived from ``StreamFormMixin`` to the queryset
     of editiable_forms.
     """
-    # Get content types of pages that inherit from StreamFormMixin.
-    sf_models = [
-        model
-        for model in get_page_models()
-        if issubclass(model, (StreamFormMixin,))
-    ]
+    # Content types of pages that inherit from StreamFormMixin. Models are
+    # found once when the app is ready, and content types are cached by
+    # Django.
+    sf_models = apps.get_app_config("wagtail_flexible_forms").stream_form_models
     sf_types = list(ContentType.objects.get_for_models(*sf_models).values())
 
     # Get all pages this user can access.
@@ -25,14 +25,19 @@ def stream_forms(user, editable_forms):
         page_permission_policy.instances_user_has_permission_for(user, "change")
     )
 
-    # Filter down StreamFormMixin pages this user can access.
-    sf_editable_forms = all_editable_pages.filter(content_type__in=sf_types)
-
-    # Combine the previous hook's ``editable_forms`` with our ``editable_forms``.
-    combined_forms_pks = list(
-        sf_editable_forms.values_list("pk", flat=True)
-    ) + list(editable_forms.values_list("pk", flat=True))
-    combined_editable_forms = all_editable_pages.filter(
-        pk__in=combined_forms_pks
+    # Combine the previous hook's ``editable_forms`` with the StreamFormMixin
+    # pages this user can access, as a subquery of a single query.
+    return all_editable_pages.filter(
+        Q(content_type__in=sf_types) | Q(pk__in=editable_forms.values("pk"))
     )
-    return combined_editable_forms
+
+
+@hooks.register("register_admin_urls")
+def register_admin_urls():
+    return [
+        path(
+            "stream_forms/<int:page_id>/statistics/",
+            AnswerStatisticsView.as_view(),
+            name="wagtail_flexible_forms_answer_statistics",
+        ),
+    ]